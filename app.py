@@ -17,6 +17,12 @@ def clean_text(text: str) -> str:
     text = re.sub(r'\s+', ' ', text).strip()
     return text
 
+def kb_context_text(doc: dict) -> str:
+    """Best-matching passages of a knowledge-base hit, falling back to its full content."""
+    if doc.get("passages"):
+        return "\n\n".join(p["text"] for p in doc["passages"] if p.get("text"))
+    return doc.get("pr_content", doc.get("summary", ""))
+
 def bedrock_qa_completion(user_prompt: str, retrieved_documents: list, mode='web'):
     """Generates an answer using Bedrock LLM with provided documents as context."""
     if mode == 'web': # for web based
@@ -34,7 +40,7 @@ def bedrock_qa_completion(user_prompt: str, retrieved_documents: list, mode='web
             cohere_documents.append({
                 "id": f"doc_{i}",
                 "summary": doc.get("summary"),
-                "content" : doc.get("pr_content")
+                "content" : kb_context_text(doc)
             })
 
     if not cohere_documents:
@@ -207,7 +213,7 @@ async def main(message: cl.Message):
                 text_content = doc.get("text", "")
                 title = doc.get("source_url", "Web Source")
             else:
-                text_content = doc.get("pr_content", doc.get("summary", ""))
+                text_content = kb_context_text(doc)
                 title = doc.get("pr_title", "KB Document")
             
             if text_content:
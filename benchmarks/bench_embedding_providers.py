@@ -0,0 +1,88 @@
+"""Compare a CPU-local embedding model against Titan on the crawled press releases.
+
+Latency is measured per single query (the search hot path) with caching
+disabled. Recall@k treats Titan's nearest neighbours as ground truth: for each
+query, the share of Titan's top-k documents the local model also ranks top-k.
+Press-release titles are used as queries against the documents' content.
+
+Usage: python -m benchmarks.bench_embedding_providers --input press_releases.jsonl --limit 500
+"""
+import argparse
+import time
+import numpy as np
+from benchmarks.latency import report_latency
+from ingest.record_stream import PRESS_RELEASES_FILE, iter_records
+from utils.bedrock import EMBEDDING_DIMENSIONS, SEARCH_DOCUMENT, SEARCH_QUERY, generate_embeddings_batch
+from utils.constants import EMBEDDING_MODEL_ID
+from utils.local_embeddings import LOCAL_EMBEDDING_MODEL, LOCAL_MODEL_PREFIX
+
+DOCUMENT_CHARS = 2000
+
+
+def load_corpus(path, limit):
+    titles, documents = [], []
+    for record in iter_records(path):
+        if record.get("pr_title") and record.get("content"):
+            titles.append(record["pr_title"])
+            documents.append(record["content"][:DOCUMENT_CHARS])
+            if len(documents) == limit:
+                break
+    return titles, documents
+
+
+def embed_matrix(texts, model_id, use_cache=True, input_type=SEARCH_DOCUMENT):
+    vectors = generate_embeddings_batch(
+        texts, model_id=model_id, use_cache=use_cache, input_type=input_type
+    )
+    return np.array([v if v else [0.0] * EMBEDDING_DIMENSIONS for v in vectors], dtype=np.float32)
+
+
+def query_latencies(queries, model_id):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        generate_embeddings_batch([query], model_id=model_id, use_cache=False, input_type=SEARCH_QUERY)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def top_k(query_vectors, doc_vectors, k):
+    scores = query_vectors @ doc_vectors.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input", default=PRESS_RELEASES_FILE)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--reference-model", default=EMBEDDING_MODEL_ID)
+    parser.add_argument("--local-model", default=LOCAL_MODEL_PREFIX + LOCAL_EMBEDDING_MODEL)
+    args = parser.parse_args()
+
+    titles, documents = load_corpus(args.input, args.limit)
+    if not documents:
+        raise SystemExit(f"No press releases with content found in {args.input}")
+    queries = titles[: args.queries]
+    print(f"{len(documents)} documents, {len(queries)} queries, k={args.k}")
+
+    # Warm the local model so its load time is not counted as query latency
+    generate_embeddings_batch(["warm up"], model_id=args.local_model, use_cache=False)
+    for model_id in (args.reference_model, args.local_model):
+        report_latency(model_id, query_latencies(queries, model_id))
+
+    # Titan document embeddings go through the on-disk cache, so reruns only pay for new texts
+    reference = top_k(
+        embed_matrix(queries, args.reference_model, input_type=SEARCH_QUERY),
+        embed_matrix(documents, args.reference_model),
+        args.k,
+    )
+    start = time.perf_counter()
+    local_docs = embed_matrix(documents, args.local_model, use_cache=False)
+    elapsed = time.perf_counter() - start
+    local = top_k(embed_matrix(queries, args.local_model, input_type=SEARCH_QUERY), local_docs, args.k)
+    print(f"local document throughput: {len(documents) / elapsed:.1f} docs/s")
+
+    recall = np.mean([len(set(r) & set(l)) / args.k for r, l in zip(reference, local)])
+    print(f"recall@{args.k} of {args.local_model} vs {args.reference_model}: {recall:.3f}")
@@ -0,0 +1,64 @@
+"""Micro-benchmark of the HTML parser backends over the local press-release cache.
+
+Usage: python -m benchmarks.bench_html_parsers --cache-dir html_cache --limit 500
+"""
+import argparse
+import time
+from ingest.html_cache import HTML_CACHE_DIR, HtmlCache, read_blob
+from ingest.pr_parsers import PARSERS
+
+
+def load_pages(cache_dir, limit=None):
+    cache = HtmlCache(cache_dir)
+    entries = cache.entries()[:limit] if limit else cache.entries()
+    pages = [(url, read_blob(path)) for url, path in entries]
+    cache.close()
+    return pages
+
+
+def normalize(fields):
+    return tuple(" ".join(value.split()) if value else None for value in fields)
+
+
+def bench(pages, repeat=3):
+    baseline = {}
+    _, bs4_fields = PARSERS["bs4"]
+    for url, html in pages:
+        try:
+            baseline[url] = normalize(bs4_fields(html))
+        except ValueError:
+            baseline[url] = None
+
+    for name, (_, fields) in PARSERS.items():
+        best = float("inf")
+        mismatches = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for url, html in pages:
+                try:
+                    result = normalize(fields(html))
+                except ValueError:
+                    result = None
+                if result != baseline[url]:
+                    mismatches += 1
+            best = min(best, time.perf_counter() - start)
+        per_page_ms = best / len(pages) * 1000
+        print(
+            f"{name:<11} {best:8.3f}s total  {per_page_ms:7.3f} ms/page  "
+            f"{len(pages) / best:9.1f} pages/s  mismatches vs bs4: {mismatches // repeat}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cache-dir", default=HTML_CACHE_DIR)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_pages(args.cache_dir, args.limit)
+    if not pages:
+        print(f"No cached pages found in {args.cache_dir}; run pr_meta_fetch first.")
+    else:
+        print(f"Benchmarking {len(pages)} cached pages with parsers: {list(PARSERS)}")
+        bench(pages, args.repeat)
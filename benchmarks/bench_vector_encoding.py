@@ -0,0 +1,80 @@
+"""Recall and latency of a re-encoded (fp16/byte) vector index against the float index.
+
+Queries are the titles of documents sampled from the float index, embedded
+with the configured model. Recall@k is the share of the float index's top-k
+documents that the candidate index also returns. Each index is queried with
+vectors in its own encoding.
+
+Usage: python -m benchmarks.bench_vector_encoding <float-index> <candidate-index> --encoding byte
+"""
+import argparse
+import statistics
+import time
+from benchmarks.latency import report_latency
+from utils.bedrock import generate_embeddings_batch
+from utils.opensearch import get_os_client
+from utils.vector_encoding import as_index_vector
+
+client = get_os_client()
+
+
+def sample_titles(index_name, count):
+    response = client.search(
+        index=index_name,
+        body={
+            "size": count,
+            "query": {"function_score": {"random_score": {"seed": 42, "field": "_seq_no"}}},
+            "_source": ["pr_title"],
+        },
+    )
+    return [hit["_source"]["pr_title"] for hit in response["hits"]["hits"] if hit["_source"].get("pr_title")]
+
+
+def knn_ids(index_name, vector, k):
+    start = time.perf_counter()
+    response = client.search(
+        index=index_name,
+        body={"size": k, "query": {"knn": {"embedding": {"vector": vector, "k": k}}}, "_source": False},
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    return [hit["_id"] for hit in response["hits"]["hits"]], elapsed, response.get("took", 0)
+
+
+def store_size_mb(index_name):
+    stats = client.indices.stats(index=index_name, metric="store")
+    return stats["_all"]["primaries"]["store"]["size_in_bytes"] / 1024 / 1024
+
+
+def report(label, timings, took):
+    report_latency(label, timings, width=40, extra=f"server p50 {statistics.median(took):5.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("float_index")
+    parser.add_argument("candidate_index")
+    parser.add_argument("--encoding", default="byte", choices=["float", "fp16", "byte"])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    titles = sample_titles(args.float_index, args.queries)
+    vectors = [v for v in generate_embeddings_batch(titles) if v]
+    print(f"{len(vectors)} queries, k={args.k}")
+
+    results = {}
+    for index_name, encoding in ((args.float_index, "float"), (args.candidate_index, args.encoding)):
+        knn_ids(index_name, as_index_vector(vectors[0], encoding), args.k)  # warm the graph
+        runs = [knn_ids(index_name, as_index_vector(v, encoding), args.k) for v in vectors]
+        results[index_name] = [ids for ids, _, _ in runs]
+        report(
+            f"{index_name} ({encoding}, {store_size_mb(index_name):.1f} MB)",
+            [elapsed for _, elapsed, _ in runs],
+            [took for _, _, took in runs],
+        )
+
+    recall = statistics.mean(
+        len(set(reference) & set(candidate)) / max(1, len(reference))
+        for reference, candidate in zip(results[args.float_index], results[args.candidate_index])
+    )
+    print(f"recall@{args.k} of {args.candidate_index} vs {args.float_index}: {recall:.3f}")
@@ -0,0 +1,14 @@
+"""Latency summaries shared by the benchmark scripts (timings in milliseconds)."""
+import statistics
+
+
+def percentiles(timings):
+    """``(p50, p99)`` of ``timings``; p99 is the nearest-rank value."""
+    timings = sorted(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    return statistics.median(timings), p99
+
+
+def report_latency(label, timings, width=50, extra=""):
+    p50, p99 = percentiles(timings)
+    print(f"{label:<{width}} p50 {p50:8.2f} ms   p99 {p99:8.2f} ms{'   ' + extra if extra else ''}")
@@ -0,0 +1,163 @@
+"""Sweep k-NN index profiles on a local OpenSearch and compare them to exact search.
+
+Vectors come from a snapshot of the production vector index (exported once to
+an .npz file). The last ``--queries`` vectors are held out as queries and the
+rest are indexed into a throwaway index on the local cluster for every
+combination of profile and HNSW parameters. Each configuration reports
+recall@k against an exact brute-force cosine top-k, p50/p99 query latency and
+build time.
+
+A single-node OpenSearch with the security plugin disabled is enough, e.g.
+``docker run -p 9200:9200 -e discovery.type=single-node
+-e DISABLE_SECURITY_PLUGIN=true opensearchproject/opensearch:2``.
+
+Usage:
+    python -m benchmarks.tune_knn_index --export --limit 20000
+    python -m benchmarks.tune_knn_index --profiles default,recall,byte --m 16,32 --ef-search 100,256
+"""
+import argparse
+import itertools
+import os
+import statistics
+import time
+import numpy as np
+from opensearchpy import OpenSearch, helpers
+from benchmarks.latency import percentiles
+from utils.index_profiles import INDEX_PROFILES, embedding_field, get_profile, index_settings
+from utils.vector_encoding import as_index_vector
+
+SNAPSHOT_FILE = "knn_snapshot.npz"
+TUNING_INDEX = "knn_tuning"
+
+
+def export_snapshot(index_name, path, limit=None):
+    from utils.opensearch import get_os_client
+
+    ids, vectors = [], []
+    for hit in helpers.scan(get_os_client(), index=index_name, _source=["embedding"]):
+        embedding = hit["_source"].get("embedding")
+        if embedding:
+            ids.append(hit["_id"])
+            vectors.append(embedding)
+            if limit and len(ids) >= limit:
+                break
+    np.savez_compressed(path, ids=np.array(ids), vectors=np.array(vectors, dtype=np.float32))
+    print(f"Exported {len(ids)} vectors from {index_name} to {path}")
+
+
+def exact_top_k(base, queries, k):
+    base = base / np.linalg.norm(base, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ base.T
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    return [set(row) for row in top]
+
+
+def build_index(client, profile, base):
+    client.indices.delete(index=TUNING_INDEX, ignore=[404])
+    client.indices.create(
+        index=TUNING_INDEX,
+        body={
+            "settings": {**index_settings(profile), "refresh_interval": "-1"},
+            "mappings": {"properties": {"embedding": embedding_field(base.shape[1], profile)}},
+        },
+    )
+    start = time.perf_counter()
+    helpers.bulk(
+        client,
+        (
+            {
+                "_index": TUNING_INDEX,
+                "_id": str(i),
+                "embedding": as_index_vector(vector.tolist(), profile["encoding"]),
+            }
+            for i, vector in enumerate(base)
+        ),
+        chunk_size=500,
+        request_timeout=300,
+    )
+    client.indices.refresh(index=TUNING_INDEX)
+    client.indices.forcemerge(index=TUNING_INDEX, max_num_segments=1, request_timeout=1800)
+    return time.perf_counter() - start
+
+
+def run_queries(client, profile, queries, k):
+    # Lucene has no ef_search setting; its beam is the query's k
+    candidates = max(k, profile["ef_search"]) if profile["engine"] == "lucene" else k
+    results, timings = [], []
+    for vector in queries:
+        body = {
+            "size": k,
+            "_source": False,
+            "query": {
+                "knn": {
+                    "embedding": {
+                        "vector": as_index_vector(vector.tolist(), profile["encoding"]),
+                        "k": candidates,
+                    }
+                }
+            },
+        }
+        start = time.perf_counter()
+        response = client.search(index=TUNING_INDEX, body=body)
+        timings.append((time.perf_counter() - start) * 1000)
+        results.append({int(hit["_id"]) for hit in response["hits"]["hits"][:k]})
+    return results, timings
+
+
+def sweep(client, base, queries, k, profile_names, grid):
+    truth = exact_top_k(base, queries, k)
+    print(f"{len(base)} indexed vectors, {len(queries)} queries, k={k}")
+    print(f"{'profile':<10}{'engine':<8}{'enc':<6}{'m':>4}{'ef_c':>6}{'ef_s':>6}"
+          f"{'recall':>9}{'p50 ms':>9}{'p99 ms':>9}{'build s':>9}")
+    for name in profile_names:
+        for m, ef_construction, ef_search in grid:
+            overrides = {"replicas": 0}
+            for key, value in (("m", m), ("ef_construction", ef_construction), ("ef_search", ef_search)):
+                if value is not None:
+                    overrides[key] = value
+            profile = get_profile(name, **overrides)
+            build_seconds = build_index(client, profile, base)
+            run_queries(client, profile, queries[:10], k)  # warm the graph
+            results, timings = run_queries(client, profile, queries, k)
+            recall = statistics.mean(len(r & t) / k for r, t in zip(results, truth))
+            p50, p99 = percentiles(timings)
+            print(
+                f"{name:<10}{profile['engine']:<8}{profile['encoding']:<6}{profile['m']:>4}"
+                f"{profile['ef_construction']:>6}{profile['ef_search']:>6}{recall:>9.3f}"
+                f"{p50:>9.2f}{p99:>9.2f}{build_seconds:>9.1f}"
+            )
+    client.indices.delete(index=TUNING_INDEX, ignore=[404])
+
+
+def int_list(value):
+    return [int(v) for v in value.split(",")] if value else [None]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--snapshot", default=SNAPSHOT_FILE)
+    parser.add_argument("--export", action="store_true", help="export the snapshot from PR_META_VECTOR_IDX first")
+    parser.add_argument("--source-index", default=None)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--profiles", default=",".join(INDEX_PROFILES))
+    parser.add_argument("--m", type=int_list, default=[None])
+    parser.add_argument("--ef-construction", type=int_list, default=[None])
+    parser.add_argument("--ef-search", type=int_list, default=[None])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.export or not os.path.exists(args.snapshot):
+        from utils.constants import PR_META_VECTOR_IDX
+
+        export_snapshot(args.source_index or PR_META_VECTOR_IDX, args.snapshot, args.limit)
+    snapshot = np.load(args.snapshot)
+    vectors = snapshot["vectors"]
+    base, queries = vectors[: -args.queries], vectors[-args.queries :]
+
+    local = OpenSearch(hosts=[{"host": args.host, "port": args.port}], timeout=120)
+    grid = list(itertools.product(args.m, args.ef_construction, args.ef_search))
+    sweep(local, base, queries, args.k, args.profiles.split(","), grid)
@@ -1,3 +1,6 @@
+from .html_cache import *
+from .pr_parsers import *
+from .record_stream import *
 from .pr_meta_fetch import *
 from .pr_meta_store import *
 from .pr_meta_store_from_local import *
\ No newline at end of file
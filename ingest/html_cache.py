@@ -0,0 +1,109 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+HTML_CACHE_DIR = "html_cache"
+
+
+def _compress(body):
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(body), ".zst"
+    return gzip.compress(body, compresslevel=6), ".gz"
+
+
+def _decompress(data, path):
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"zstandard is required to read {path}")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def read_blob(path):
+    with open(path, "rb") as fp:
+        return _decompress(fp.read(), path)
+
+
+class HtmlCache:
+    """Content-addressed, compressed store of raw HTML keyed by URL.
+
+    Bodies are written once under ``objects/<sha256[:2]>/<sha256>`` (zstd when
+    available, gzip otherwise) and a small SQLite table maps each URL to the
+    digest of its latest body, so identical pages share a blob and re-fetching
+    an unchanged page is a no-op on disk. ``put`` may be called from worker
+    threads (the crawler runs it via ``asyncio.to_thread``); index access is
+    serialized by a lock.
+    """
+
+    def __init__(self, cache_dir=HTML_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(os.path.join(cache_dir, "objects"), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(cache_dir, "index.sqlite3"), check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, digest TEXT NOT NULL, path TEXT NOT NULL, fetched_at REAL)"
+        )
+        self.conn.commit()
+
+    def _blob_dir(self, digest):
+        return os.path.join(self.cache_dir, "objects", digest[:2])
+
+    def _find_blob(self, digest):
+        blob_dir = self._blob_dir(digest)
+        for ext in (".zst", ".gz"):
+            path = os.path.join(blob_dir, digest + ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put(self, url, body):
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._find_blob(digest)
+        if path is None:
+            data, ext = _compress(body)
+            os.makedirs(self._blob_dir(digest), exist_ok=True)
+            path = os.path.join(self._blob_dir(digest), digest + ext)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as fp:
+                fp.write(data)
+            os.replace(tmp_path, path)
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (url, digest, path, fetched_at) VALUES (?, ?, ?, ?)",
+                (url, digest, os.path.relpath(path, self.cache_dir), time.time()),
+            )
+            self.conn.commit()
+        return digest
+
+    def path_for(self, url):
+        with self._lock:
+            row = self.conn.execute("SELECT path FROM pages WHERE url = ?", (url,)).fetchone()
+        return os.path.join(self.cache_dir, row[0]) if row else None
+
+    def get(self, url):
+        path = self.path_for(url)
+        if path is None or not os.path.exists(path):
+            return None
+        return read_blob(path)
+
+    def entries(self):
+        """Return ``(url, blob_path)`` pairs for every cached page."""
+        with self._lock:
+            rows = self.conn.execute("SELECT url, path FROM pages ORDER BY url").fetchall()
+        return [(url, os.path.join(self.cache_dir, path)) for url, path in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
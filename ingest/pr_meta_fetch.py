@@ -1,99 +1,437 @@
 import requests
-from bs4 import BeautifulSoup
+import argparse
+import asyncio
+import aiohttp
 import concurrent.futures
+import hashlib
 import os
 from datetime import datetime
 import json
-import os
+import re
+from ingest.html_cache import HTML_CACHE_DIR, HtmlCache, read_blob
+from ingest.pr_parsers import get_parser
+from ingest.record_stream import PRESS_RELEASES_FILE, RecordWriter
 
+ROOT_PATH = "https://larson.house.gov"
+BASE_URL = f"{ROOT_PATH}/media-center/press-releases"
+REQUEST_TIMEOUT = 10
+PER_HOST_CONCURRENCY = 8
+LISTING_WORKERS = 4
+DETAIL_WORKERS = 16
+MAX_LISTING_PAGES = 1000
+PROBE_RETRIES = 3
+CRAWL_STATE_FILE = "crawl_state.json"
 
-def writeToJSONFile(path, fileName, data):
-    # Ensure the directory exists
-    if not os.path.exists(path):
-        os.makedirs(path)
-    filePathNameWExt = os.path.join(path, f"{fileName}.json")
-    with open(filePathNameWExt, "w+") as fp:
-        json.dump(data, fp, indent=4)
+
+def parse_links(html, parser=None):
+    links, _ = get_parser(parser)
+    return list({ROOT_PATH + href for href in links(html)})
+
+
+def clean_text(text):
+    text = re.sub(r"[^a-zA-Z0-9\s]", "", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text
 
 
-def fetch_links(url):
-    root_path = "https://larson.house.gov"
+def parse_press_release_info(url, html, parser=None):
+    """Extract url, title, date and cleaned body text from one press release page."""
+    _, fields = get_parser(parser)
+    title, date, body = fields(html)
+
+    title = title.strip() if title else "No Title Found"
+    date = date.strip() if date else "No Date Found"
     try:
-        response = requests.get(url, timeout=10)
+        date_obj = datetime.strptime(date, "%B %d, %Y")
+        date = date_obj.strftime("%Y-%m-%d")
+    except ValueError:
+        pass
+    content = body.strip() if body else "No content Found"
+
+    return {
+        "pr_url": url,
+        "pr_title": title,
+        "pr_date": date,
+        "content": clean_text(content),
+    }
+
+
+def fetch_press_release_info(url):
+    try:
+        response = requests.get(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-        linkset = set()
-        for a in soup.find_all("a", href=True):
-            if a["href"].startswith("/media-center/press-releases/"):
-                url = root_path + a["href"]
-                linkset.add(url)
-        return list(linkset)
+        return parse_press_release_info(url, response.content)
     except requests.exceptions.RequestException as e:
         print(f"Request error for {url}: {e}")
-        return []
+        return None
     except Exception as e:
         print(f"An error occurred for {url}: {e}")
-        return []
+        return None
 
 
-def fetch_press_release_info(url):
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-
-        # Extract title
-        title = soup.find("h1").text.strip() if soup.find("h1") else "No Title Found"
-
-        # Extract date
-        date_span = (
-            soup.find("div", class_="page__content evo-page-content")
-            .contents[0]
-            .find("div", class_="col-auto")
-        )
-        date = date_span.text.strip() if date_span else "No Date Found"
-        try:
-            date_obj = datetime.strptime(date, "%B %d, %Y")
-            date = date_obj.strftime("%Y-%m-%d")
-        except ValueError:
-            pass
+def last_page_search(max_pages=MAX_LISTING_PAGES):
+    """Yield listing pages to probe and receive whether each one has links.
 
-        return {"pr_url": url, "pr_title": title, "pr_date": date}
-    except requests.exceptions.RequestException as e:
+    Probes pages 1, 2, 4, 8, ... until an empty page brackets the end of the
+    archive, then binary-searches inside the bracket, so the last page is found
+    in about 2*log2(n) requests. The generator's return value is the last
+    non-empty page (0 when the archive is empty). It is driven with ``send``,
+    which keeps the search itself free of I/O.
+    """
+    if not (yield 1):
+        return 0
+    low, high = 1, 2
+    while high <= max_pages:
+        if not (yield high):
+            break
+        low, high = high, high * 2
+    high = min(high, max_pages + 1)
+    while high - low > 1:
+        mid = (low + high) // 2
+        if (yield mid):
+            low = mid
+        else:
+            high = mid
+    return low
+
+
+def load_crawl_state(path=CRAWL_STATE_FILE):
+    if not os.path.exists(path):
+        return {"pages": {}, "urls": {}}
+    with open(path, "r") as fp:
+        state = json.load(fp)
+    state.setdefault("pages", {})
+    state.setdefault("urls", {})
+    return state
+
+
+def save_crawl_state(state, path=CRAWL_STATE_FILE):
+    # Write to a temp file first so an interrupted run never truncates the state
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as fp:
+        json.dump(state, fp, indent=4)
+    os.replace(tmp_path, path)
+
+
+def content_hash(body):
+    return hashlib.sha256(body).hexdigest()
+
+
+def build_validators(headers, body):
+    return {
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "content_hash": content_hash(body),
+    }
+
+
+def conditional_headers(validators):
+    headers = {}
+    if not validators:
+        return headers
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+async def fetch_page(session, url, validators=None):
+    """Return ``(status, body, headers)`` for ``url``, or None on a request error.
+
+    When ``validators`` are given the request is sent as a conditional GET, and a
+    200 whose body hashes to the stored ``content_hash`` is reported as a 304 so
+    servers that ignore ETag/Last-Modified still short-circuit.
+    """
+    try:
+        async with session.get(url, headers=conditional_headers(validators)) as response:
+            if response.status == 304:
+                return 304, None, response.headers
+            response.raise_for_status()
+            body = await response.read()
+            if validators and validators.get("content_hash") == content_hash(body):
+                return 304, None, response.headers
+            return response.status, body, response.headers
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         print(f"Request error for {url}: {e}")
         return None
+
+
+async def fetch_html(session, url):
+    response = await fetch_page(session, url)
+    return response[1] if response else None
+
+
+async def fetch_detail(session, url, state=None, cache=None):
+    # Only unseen detail pages are fetched, so there are no validators to send;
+    # the ones recorded here seed the known-URL check of later incremental runs
+    response = await fetch_page(session, url)
+    if response is None or response[0] == 304:
+        return None
+    _, body, headers = response
+    if cache is not None:
+        # Compression and the SQLite commit would otherwise stall every other worker
+        await asyncio.to_thread(cache.put, url, body)
+    try:
+        info = parse_press_release_info(url, body)
     except Exception as e:
         print(f"An error occurred for {url}: {e}")
         return None
+    if state is not None:
+        state["urls"][url] = build_validators(headers, body)
+    return info
+
+
+async def probe_links_async(session, url, retries=PROBE_RETRIES):
+    for attempt in range(1, retries + 1):
+        html = await fetch_html(session, url)
+        if html is not None:
+            return parse_links(html)
+        print(f"Probe attempt {attempt}/{retries} failed for {url}")
+    raise RuntimeError(f"Could not fetch listing page {url} after {retries} attempts")
+
+
+async def discover_last_page_async(session, base_url, max_pages=MAX_LISTING_PAGES):
+    probed = {}
+    search = last_page_search(max_pages)
+    try:
+        page = next(search)
+        while True:
+            probed[page] = await probe_links_async(session, f"{base_url}?page={page}")
+            page = search.send(bool(probed[page]))
+    except StopIteration as stop:
+        last_page = stop.value
+    print(f"Discovered {last_page} listing pages using {len(probed)} probes")
+    return last_page, {page: links for page, links in probed.items() if page <= last_page}
+
+
+def open_session(per_host_limit=PER_HOST_CONCURRENCY):
+    connector = aiohttp.TCPConnector(limit_per_host=per_host_limit, keepalive_timeout=30)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+async def _enqueue_links(links, link_queue, seen_links):
+    for link in links:
+        if link not in seen_links:
+            seen_links.add(link)
+            await link_queue.put(link)
+
+
+async def _listing_worker(session, page_queue, link_queue, seen_links, failed_pages):
+    while True:
+        page_url = await page_queue.get()
+        try:
+            html = await fetch_html(session, page_url)
+            if html is None:
+                failed_pages.append(page_url)
+                continue
+            await _enqueue_links(parse_links(html), link_queue, seen_links)
+        except Exception as e:
+            print(f"An error occurred for {page_url}: {e}")
+        finally:
+            page_queue.task_done()
+
+
+async def _detail_worker(session, link_queue, emit, state, cache):
+    while True:
+        url = await link_queue.get()
+        try:
+            info = await fetch_detail(session, url, state, cache=cache)
+            if info:
+                emit(info)
+        except Exception as e:
+            print(f"An error occurred for {url}: {e}")
+        finally:
+            link_queue.task_done()
+
+
+async def crawl_press_releases(
+    base_url=BASE_URL,
+    max_pages=MAX_LISTING_PAGES,
+    per_host_limit=PER_HOST_CONCURRENCY,
+    listing_workers=LISTING_WORKERS,
+    detail_workers=DETAIL_WORKERS,
+    state=None,
+    cache=None,
+    sink=None,
+):
+    """Crawl listing and detail pages in one pipeline over a shared keep-alive session.
 
+    The last listing page is discovered first (see ``last_page_search``) so only
+    the real page range is fanned out. Listing workers push newly seen press-release links onto a queue that detail
+    workers drain while paging is still in progress; the connector caps open
+    connections per host so the site is never hit by more than ``per_host_limit``
+    requests at once. Validators for every fetched page are recorded in
+    ``state`` when one is passed, seeding later incremental runs, and raw
+    detail pages are written to ``cache`` so they can be re-parsed offline.
 
-def fetch_all_links(base_url, max_pages=326):
-    all_links = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_url = {
-            executor.submit(fetch_links, f"{base_url}?page={page}"): page
-            for page in range(1, max_pages + 1)
-        }
-        for future in concurrent.futures.as_completed(future_to_url):
-            links = future.result()
-            if links:
-                all_links.extend(links)
+    Each parsed record is passed to ``sink`` as soon as it arrives; without a
+    sink the records are collected and returned.
+    """
+    page_queue = asyncio.Queue()
+    link_queue = asyncio.Queue(maxsize=detail_workers * 4)
+    seen_links = set()
+    failed_pages = []
+    results = []
+    emit = sink or results.append
+    parsed = 0
+
+    def count_and_emit(record):
+        nonlocal parsed
+        parsed += 1
+        emit(record)
+
+    async with open_session(per_host_limit) as session:
+        last_page, probed = await discover_last_page_async(session, base_url, max_pages)
+        for page in range(1, last_page + 1):
+            if page not in probed:
+                page_queue.put_nowait(f"{base_url}?page={page}")
+
+        workers = [
+            asyncio.create_task(
+                _listing_worker(session, page_queue, link_queue, seen_links, failed_pages)
+            )
+            for _ in range(listing_workers)
+        ]
+        workers += [
+            asyncio.create_task(_detail_worker(session, link_queue, count_and_emit, state, cache))
+            for _ in range(detail_workers)
+        ]
+        for page in sorted(probed):
+            await _enqueue_links(probed[page], link_queue, seen_links)
+        await page_queue.join()
+        await link_queue.join()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    if failed_pages:
+        print(f"Warning: failed to fetch listing pages {failed_pages}")
+    print(f"Crawled {len(seen_links)} links, parsed {parsed} press releases")
+    return results
+
+
+async def crawl_incremental(
+    base_url=BASE_URL,
+    state=None,
+    max_pages=MAX_LISTING_PAGES,
+    per_host_limit=PER_HOST_CONCURRENCY,
+    cache=None,
+    sink=None,
+):
+    """Fetch only press releases that are not yet in ``state``.
+
+    Listing pages are walked newest-first with conditional GETs, and paging stops
+    at the first page that is unchanged or whose links are all already known.
+    A page's validators are saved only once every new link on it has been
+    fetched, so releases that failed are retried on the next run instead of
+    hidden behind a 304. New records go to ``sink`` when given, otherwise
+    they are returned.
+    """
+    state = state if state is not None else {"pages": {}, "urls": {}}
+    new_records = []
+    emit = sink or new_records.append
+    found = 0
+    async with open_session(per_host_limit) as session:
+        for page in range(1, max_pages + 1):
+            page_url = f"{base_url}?page={page}"
+            response = await fetch_page(session, page_url, state["pages"].get(page_url))
+            if response is None:
+                break
+            status, body, headers = response
+            if status == 304:
+                print(f"Listing page {page} unchanged, stopping")
+                break
+            links = parse_links(body)
+            new_links = [link for link in links if link not in state["urls"]]
+            if not new_links:
+                state["pages"][page_url] = build_validators(headers, body)
+                print(f"All links on listing page {page} already known, stopping")
+                break
+            records = await asyncio.gather(
+                *(fetch_detail(session, link, state, cache=cache) for link in new_links)
+            )
+            for record in records:
+                if record:
+                    found += 1
+                    emit(record)
+            if all(records):
+                state["pages"][page_url] = build_validators(headers, body)
             else:
-                break 
-    return all_links
+                print(f"{records.count(None)} press releases on listing page {page} failed, will retry")
+    print(f"Incremental crawl found {found} new press releases")
+    return new_records
+
+
+def _parse_cached_page(entry):
+    url, path = entry
+    try:
+        return parse_press_release_info(url, read_blob(path))
+    except Exception as e:
+        print(f"An error occurred re-parsing {url}: {e}")
+        return None
+
+
+def replay_from_cache(cache, max_workers=None, sink=None):
+    """Re-parse every cached press release offline, spread across CPU cores."""
+    entries = cache.entries()
+    records = []
+    emit = sink or records.append
+    parsed = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for record in executor.map(_parse_cached_page, entries, chunksize=64):
+            if record:
+                parsed += 1
+                emit(record)
+    print(f"Re-parsed {parsed} of {len(entries)} cached press releases")
+    return records
 
 
 if __name__ == "__main__":
-    base_url = "https://larson.house.gov/media-center/press-releases"
-    all_links = fetch_all_links(base_url)
-    data = list()
-    if all_links:
-        print("Press Releases found:")
-        for link in all_links:
-            info = fetch_press_release_info(link)
-            if info:
-                data.append(info)
-        print("Writing to JSON file...")
-        writeToJSONFile("./", "press_releases", data)
+    parser = argparse.ArgumentParser(description="Crawl larson.house.gov press releases")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch press releases missing from the crawl state file",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Re-parse the local HTML cache instead of crawling",
+    )
+    parser.add_argument("--state-file", default=CRAWL_STATE_FILE)
+    parser.add_argument("--cache-dir", default=HTML_CACHE_DIR)
+    parser.add_argument(
+        "--output",
+        default=PRESS_RELEASES_FILE,
+        help="JSONL output file; use a .gz suffix to compress it",
+    )
+    args = parser.parse_args()
+
+    cache = HtmlCache(args.cache_dir)
+    # A full crawl or replay replaces the output only once it has finished
+    writer = RecordWriter(args.output, append=args.incremental, atomic=True)
+    try:
+        if args.replay:
+            replay_from_cache(cache, sink=writer.write)
+        else:
+            state = load_crawl_state(args.state_file)
+            try:
+                if args.incremental:
+                    asyncio.run(crawl_incremental(BASE_URL, state, cache=cache, sink=writer.write))
+                else:
+                    asyncio.run(
+                        crawl_press_releases(BASE_URL, state=state, cache=cache, sink=writer.write)
+                    )
+            finally:
+                save_crawl_state(state, args.state_file)
+        writer.commit()
+    finally:
+        writer.close()
+        cache.close()
+
+    if writer.count:
+        print(f"Wrote {writer.count} press releases to {args.output}")
     else:
         print("No links found or an error occurred.")
@@ -1,14 +1,21 @@
 from opensearchpy import helpers
-import boto3
-from datetime import datetime
-import requests
-from bs4 import BeautifulSoup
-import re
-import time
+import queue
+import threading
+from ingest.pr_meta_fetch import fetch_press_release_info as fetch_press_release_record
+from utils.bulk_writer import BulkWriter
+from utils.checkpoint import CHECKPOINT_DB, CheckpointJournal
+from utils.doc_ids import doc_id_for_url
 from utils.opensearch import OS_CLIENT, PR_META_RAW_IDX, PR_META_URL_IDX
 
 region = "us-east-1"
 client = OS_CLIENT
+SCAN_PAGE_SIZE = 1000
+SCAN_KEEP_ALIVE = "5m"
+BULK_BATCH_SIZE = 200
+FETCH_WORKERS = 8
+QUEUE_SIZE = 100
+FLUSH_INTERVAL = 10.0
+UNPROCESSED_QUERY = {"term": {"processed": False}}
 
 
 def check_index_exists(index_name):
@@ -23,72 +30,63 @@ def create_index(index_name):
         print(f"Error creating index: {e}")
 
 
-def clean_text(text):
-    text = re.sub(r"[^a-zA-Z0-9\s]", "", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
-
-
 def fetch_press_release_info(url):
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-
-        # Extract title
-        title = soup.find("h1").text.strip() if soup.find("h1") else "No Title Found"
-        body = (
-            soup.find("div", class_="page__content evo-page-content")
-            .contents[0]
-            .find("div", class_="evo-press-release__body")
-        )
-        content = body.text.strip() if body else "No content Found"
-        return clean_text(content)
-    except requests.exceptions.RequestException as e:
-        print(f"Request error for {url}: {e}")
-        return None
-    except Exception as e:
-        print(f"An error occurred for {url}: {e}")
-        return None
+    info = fetch_press_release_record(url)
+    return info["content"] if info else None
 
 
-def search_unprocessed_entries(index_name=PR_META_URL_IDX):
+def iter_unprocessed_entries(
+    index_name=PR_META_URL_IDX, page_size=SCAN_PAGE_SIZE, keep_alive=SCAN_KEEP_ALIVE
+):
+    """Stream every ``processed: false`` entry in one pass, with no 10k result cap.
+
+    Pages through a point-in-time snapshot with ``search_after`` so documents
+    flipped to processed mid-run do not shift later pages. Clusters without PIT
+    support fall back to a scroll via ``helpers.scan``.
+    """
     try:
-        response = client.search(
-            index=index_name, body={"query": {"term": {"processed": False}}}, size=10000
-        )
-        return response["hits"]["hits"]
+        pit_id = client.create_point_in_time(index=index_name, keep_alive=keep_alive)["pit_id"]
     except Exception as e:
-        print(f"Error searching unprocessed entries: {e}")
-        return []
-
+        print(f"Point in time unavailable for {index_name} ({e}), falling back to scroll")
+        yield from helpers.scan(
+            client,
+            index=index_name,
+            query={"query": UNPROCESSED_QUERY},
+            size=page_size,
+            scroll=keep_alive,
+        )
+        return
 
-def search_unprocessed_entries_by_date(
-    year=None, month=None, index_name=PR_META_URL_IDX
-):
-    query = {"bool": {"must": [{"term": {"processed": False}}]}}
+    try:
+        search_after = None
+        while True:
+            body = {
+                "size": page_size,
+                "query": UNPROCESSED_QUERY,
+                "pit": {"id": pit_id, "keep_alive": keep_alive},
+                "sort": [{"pr_url.keyword": "asc"}, {"_doc": "asc"}],
+            }
+            if search_after:
+                body["search_after"] = search_after
+            response = client.search(body=body)
+            pit_id = response.get("pit_id", pit_id)
+            hits = response["hits"]["hits"]
+            if not hits:
+                break
+            yield from hits
+            search_after = hits[-1]["sort"]
+    finally:
+        try:
+            client.delete_point_in_time(body={"pit_id": [pit_id]})
+        except Exception as e:
+            print(f"Error deleting point in time: {e}")
 
-    if year:
-        query["bool"]["filter"] = [
-            {"range": {"pr_date": {"gte": f"{year}-01-01", "lt": f"{year + 1}-01-01"}}}
-        ]
 
-    if month:
-        query["bool"]["filter"].append(
-            {
-                "range": {
-                    "pr_date": {
-                        "gte": f"{year}-{month:02d}-01",
-                        "lt": f"{year}-{month+1:02d}-01",
-                    }
-                }
-            }
-        )
+def search_unprocessed_entries(index_name=PR_META_URL_IDX):
     try:
-        response = client.search(index=index_name, body={"query": query}, size=10000)
-        return response["hits"]["hits"]
+        return list(iter_unprocessed_entries(index_name))
     except Exception as e:
-        print(f"Error searching unprocessed entries by date: {e}")
+        print(f"Error searching unprocessed entries: {e}")
         return []
 
 
@@ -139,129 +137,173 @@ def bulk_update_processed_flags(ids, index_name=PR_META_URL_IDX):
         print(f"Error in bulk update of processed flags: {e}")
 
 
-def process_skipped_entries():
-    unprocessed_entries = search_unprocessed_entries()
-    print(f"Unprocessed entries: {len(unprocessed_entries)}")
-
-    bulk_raw_actions = []
-    processed_ids = []
+def build_raw_action(entry):
+    """Fetch one URL entry's body and return its PR_META_RAW_IDX bulk action, or None."""
+    pr_url = entry["_source"]["pr_url"]
+    pr_date = entry["_source"]["pr_date"]
+    try:
+        pr_title = entry["_source"]["pr_title"]
+    except KeyError:
+        pr_title = entry["_source"]["pr_pr_title"]
+    content = fetch_press_release_info(pr_url)
+    if not content:
+        print(f"No content found for {pr_url}, skipping")
+        return None
 
-    for entry in unprocessed_entries:
-        pr_id = entry["_id"]
-        pr_url = entry["_source"]["pr_url"]
-        pr_date = entry["_source"]["pr_date"]
+    # Prepare the data to store in PR_META_RAW_IDX
+    raw_data = {
+        "pr_url": pr_url,
+        "pr_date": pr_date,
+        "pr_title": pr_title,
+        "content": content,
+    }
+    return {
+        "_op_type": "index",
+        "_index": PR_META_RAW_IDX,
+        "_id": doc_id_for_url(pr_url),
+        "_source": raw_data,
+    }
+
+
+def processed_flag_action(identifier, processed=True, index_name=PR_META_URL_IDX):
+    return {
+        "_op_type": "update",
+        "_index": index_name,
+        "_id": identifier,
+        "doc": {"processed": processed},
+    }
+
+
+def _fetch_worker(entry_queue, action_queue, journal):
+    while True:
+        entry = entry_queue.get()
+        if entry is None:
+            break
+        pr_url = entry["_source"].get("pr_url")
         try:
-            pr_title = entry["_source"]["pr_title"]
-        except KeyError:
-            pr_title = entry["_source"]["pr_pr_title"]
-        content = fetch_press_release_info(pr_url)
-        if not content:
-            print(f"No content found for {pr_url}, skipping")
-            continue
-
-        # Prepare the data to store in PR_META_RAW_IDX
-        raw_data = {
-            "pr_url": pr_url,
-            "pr_date": pr_date,
-            "pr_title": pr_title,
-            "content": content,
-        }
+            if journal.reached(doc_id_for_url(pr_url), "raw_stored"):
+                # Raw document survived a previous crash; only the flag is missing
+                action_queue.put((None, entry["_id"]))
+                continue
+            action = build_raw_action(entry)
+            if action is not None:
+                journal.record(action["_id"], "fetched", pr_url=pr_url)
+                action_queue.put((action, entry["_id"]))
+        except Exception as e:
+            print(f"Error fetching {pr_url}: {e}")
+            journal.record_failure(doc_id_for_url(pr_url), "fetched", e, pr_url=pr_url)
 
-        # Add to bulk actions
-        action = {
-            "_op_type": "index",
-            "_index": PR_META_RAW_IDX,
-            "_id": pr_id,
-            "_source": raw_data,
-        }
-        bulk_raw_actions.append(action)
-        processed_ids.append(pr_id)
 
-    # Perform bulk insert for raw data
-    if bulk_raw_actions:
+def _write_loop(action_queue, writer, pending):
+    # A failed flush must not end the loop: fetch workers block on the bounded
+    # queue until it is drained.
+    while True:
         try:
-            success, failed = helpers.bulk(client, bulk_raw_actions, stats_only=True)
-            failed = failed if isinstance(failed, int) else len(failed)
-            print(
-                f"Bulk insert to {PR_META_RAW_IDX}: {success} succeeded, {failed} failed"
-            )
-            if success > 0:
-                bulk_update_processed_flags(processed_ids)
+            item = action_queue.get(timeout=writer.flush_interval)
+        except queue.Empty:
+            try:
+                writer.flush_if_due()
+            except Exception as e:
+                print(f"Error flushing bulk writer: {e}")
+            continue
+        if item is None:
+            break
+        raw_action, url_id = item
+        try:
+            if raw_action is None:
+                writer.add(processed_flag_action(url_id))
+                continue
+            pending[raw_action["_id"]] = url_id
+            writer.add(raw_action, processed_flag_action(url_id))
         except Exception as e:
-            print(f"Error in bulk insert to {PR_META_RAW_IDX}: {e}")
-    print("************************************")
-    print(f"Completed processing")
-    print("************************************")
+            print(f"Error writing entry {url_id}: {e}")
+
 
+def process_entries(
+    fetch_workers=FETCH_WORKERS,
+    batch_size=BULK_BATCH_SIZE,
+    flush_interval=FLUSH_INTERVAL,
+    journal=None,
+):
+    """Fetch unprocessed URLs concurrently and write them with a single bulk writer.
 
-def process_entries():
-    ym_tuple = [(y, m) for y in range(2000, 2025) for m in range(1, 13)]
+    ``fetch_workers`` threads pull entries from a bounded queue and push raw-index
+    actions to a second bounded queue. The writer thread sends each raw document
+    and its ``processed`` flag update in the same bulk request, flushing every
+    ``batch_size`` documents or ``flush_interval`` seconds. Flags whose raw write
+    failed are reset so the next run retries them.
 
+    Progress is recorded in the checkpoint ``journal``: documents already
+    ``raw_stored`` by an interrupted run only get their flag flipped, without
+    being fetched again.
+    """
     if not check_index_exists(PR_META_RAW_IDX):
         create_index(PR_META_RAW_IDX)
 
-    for year, month in ym_tuple:
-        print(f"Processing year: {year}, month: {month}")
-        unprocessed_entries_by_date = search_unprocessed_entries_by_date(
-            year=year, month=month
-        )
-        print(
-            f"Unprocessed entries for {year}-{month}: {len(unprocessed_entries_by_date)}"
-        )
-        bulk_raw_actions = []
-        processed_ids = []
-
-        for entry in unprocessed_entries_by_date:
-            pr_id = entry["_id"]
-            pr_url = entry["_source"]["pr_url"]
-            pr_date = entry["_source"]["pr_date"]
-            try:
-                pr_title = entry["_source"]["pr_title"]
-            except KeyError:
-                pr_title = entry["_source"]["pr_pr_title"]
-            content = fetch_press_release_info(pr_url)
-            if not content:
-                print(f"No content found for {pr_url}, skipping")
-                continue
+    journal = journal or CheckpointJournal(CHECKPOINT_DB)
+    pending = {}
 
-            # Prepare the data to store in PR_META_RAW_IDX
-            raw_data = {
-                "pr_url": pr_url,
-                "pr_date": pr_date,
-                "pr_title": pr_title,
-                "content": content,
-            }
+    def record_raw_stored(actions):
+        stored = [action["_id"] for action in actions if action.get("_index") == PR_META_RAW_IDX]
+        if stored:
+            journal.record_many(stored, "raw_stored")
 
-            # Add to bulk actions
-            action = {
-                "_op_type": "index",
-                "_index": PR_META_RAW_IDX,
-                "_id": pr_id,
-                "_source": raw_data,
-            }
-            bulk_raw_actions.append(action)
-            processed_ids.append(pr_id)
+    def reset_failed_flags(failed_items):
+        retry_ids = [
+            pending[item["_id"]]
+            for item in failed_items
+            if item.get("_index") == PR_META_RAW_IDX and item.get("_id") in pending
+        ]
+        if not retry_ids:
+            return
+        try:
+            helpers.bulk(
+                client,
+                [processed_flag_action(url_id, processed=False) for url_id in retry_ids],
+                raise_on_error=False,
+                raise_on_exception=False,
+            )
+        except Exception as e:
+            print(f"Error resetting processed flags for {len(retry_ids)} entries: {e}")
+
+    writer = BulkWriter(
+        client,
+        flush_size=batch_size * 2,
+        flush_interval=flush_interval,
+        on_failure=reset_failed_flags,
+        on_success=record_raw_stored,
+    )
+    entry_queue = queue.Queue(maxsize=QUEUE_SIZE)
+    action_queue = queue.Queue(maxsize=QUEUE_SIZE)
+    workers = [
+        threading.Thread(target=_fetch_worker, args=(entry_queue, action_queue, journal), daemon=True)
+        for _ in range(fetch_workers)
+    ]
+    writer_thread = threading.Thread(
+        target=_write_loop, args=(action_queue, writer, pending), daemon=True
+    )
+    for worker in workers:
+        worker.start()
+    writer_thread.start()
+
+    seen = 0
+    for entry in iter_unprocessed_entries():
+        seen += 1
+        entry_queue.put(entry)
+    for _ in workers:
+        entry_queue.put(None)
+    for worker in workers:
+        worker.join()
+    action_queue.put(None)
+    writer_thread.join()
+    success, failed = writer.close()
 
-        # Perform bulk insert for raw data
-        if bulk_raw_actions:
-            try:
-                success, failed = helpers.bulk(
-                    client, bulk_raw_actions, stats_only=True
-                )
-                failed = failed if isinstance(failed, int) else len(failed)
-                print(
-                    f"Bulk insert to {PR_META_RAW_IDX}: {success} succeeded, {failed} failed"
-                )
-                if success > 0:
-                    bulk_update_processed_flags(processed_ids)
-            except Exception as e:
-                print(f"Error in bulk insert to {PR_META_RAW_IDX}: {e}")
-        print("************************************")
-        print(f"Completed processing: {year}-{month}")
-        print("************************************")
+    print("************************************")
+    print(f"Completed processing {seen} unprocessed entries: {success} actions succeeded, {failed} failed")
+    print("************************************")
 
 
-process_entries()
-process_skipped_entries()
-print("Processing complete")
-client.close()
+if __name__ == "__main__":
+    process_entries()
+    print("Processing complete")
+    client.close()
@@ -1,72 +1,167 @@
-import json
+import argparse
 import os
-from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
-import boto3
-from datetime import datetime
-import time
-from utils.opensearch import OS_CLIENT, PR_META_URL_IDX
+from opensearchpy import helpers
+from ingest.record_stream import PRESS_RELEASES_FILE, iter_records
+from utils.checkpoint import CHECKPOINT_DB, CheckpointJournal
+from utils.doc_ids import doc_id_for_url
+from utils.opensearch import OS_CLIENT, PR_META_RAW_IDX, PR_META_URL_IDX
 
 PR_META_URL_IDX = "pr_meta_url_index"
+BULK_CHUNK_SIZE = 500
+BULK_MAX_RETRIES = 3
 
 client = OS_CLIENT
 
 
 def add_processed_flag(data):
+    # Entries crawled with their body already go straight to the raw index
     for entry in data:
-        entry["processed"] = False
-    return data
+        entry["processed"] = bool(entry.get("content"))
+        yield entry
 
 
-def store_in_opensearch(data, index_name=PR_META_URL_IDX):
+def build_bulk_actions(data, index_name, raw_index_name):
+    for entry in data:
+        doc_id = doc_id_for_url(entry["pr_url"])
+        entry["doc_id"] = doc_id
+        content = entry.pop("content", None)
+        # Upsert so re-staging a URL refreshes its metadata without resetting
+        # a processed flag that pr_meta_store has already flipped.
+        metadata = {key: value for key, value in entry.items() if key != "processed"}
+        if content:
+            metadata["processed"] = True
+        yield {
+            "_op_type": "update",
+            "_index": index_name,
+            "_id": doc_id,
+            "doc": metadata,
+            "upsert": entry,
+        }
+        if content:
+            raw_data = {
+                "pr_url": entry["pr_url"],
+                "pr_date": entry["pr_date"],
+                "pr_title": entry["pr_title"],
+                "content": content,
+            }
+            yield {"_op_type": "index", "_index": raw_index_name, "_id": doc_id, "_source": raw_data}
+
+
+def reset_processed_flags(doc_ids, index_name=PR_META_URL_IDX):
+    """Clear ``processed`` on URL entries whose raw write failed, so pr_meta_store fetches them."""
     try:
-        response = client.search(
-            index=index_name,
-            body={
-                "size": 1,
-                "query": {"match_all": {}},
-                "sort": [{"id": {"order": "desc"}}],
-            },
+        helpers.bulk(
+            client,
+            (
+                {"_op_type": "update", "_index": index_name, "_id": doc_id, "doc": {"processed": False}}
+                for doc_id in doc_ids
+            ),
+            raise_on_error=False,
+            raise_on_exception=False,
         )
-        if response["hits"]["hits"]:
-            last_id = response["hits"]["hits"][0]["_source"]["id"]
-            next_id = last_id + 1
-        else:
-            next_id = 1
     except Exception as e:
-        print(f"Error retrieving last ID: {e}")
-        next_id = 1
-    time.sleep(3)
-    for entry in data:
-        try:
-            entry["id"] = next_id
-            client.index(index=index_name, id=next_id, body=entry)
-            print(f"Stored entry with ID {next_id}")
-            next_id += 1
-        except Exception as e:
-            print(f"Error storing entry {entry['pr_url']} in OpenSearch: {e}")
+        print(f"Error resetting processed flags for {len(doc_ids)} entries: {e}")
+
+
+def store_in_opensearch(
+    data,
+    index_name=PR_META_URL_IDX,
+    raw_index_name=PR_META_RAW_IDX,
+    chunk_size=BULK_CHUNK_SIZE,
+    thread_count=1,
+    journal=None,
+):
+    """Bulk-index staged URL entries (and any crawled content) in chunks of ``chunk_size``.
+
+    ``thread_count > 1`` switches to ``parallel_bulk``; otherwise ``streaming_bulk``
+    is used so rejected chunks are retried with backoff. Every failed item is
+    reported individually instead of aborting the load. Crawled content written
+    to the raw index is recorded as ``raw_stored`` in the checkpoint ``journal``;
+    entries whose raw write failed get their ``processed`` flag reset.
+    """
+    actions = build_bulk_actions(data, index_name, raw_index_name)
+    if thread_count > 1:
+        results = helpers.parallel_bulk(
+            client,
+            actions,
+            thread_count=thread_count,
+            chunk_size=chunk_size,
+            raise_on_error=False,
+            raise_on_exception=False,
+        )
+    else:
+        results = helpers.streaming_bulk(
+            client,
+            actions,
+            chunk_size=chunk_size,
+            max_retries=BULK_MAX_RETRIES,
+            raise_on_error=False,
+            raise_on_exception=False,
+        )
+
+    success, failed = 0, 0
+    failed_raw = []
+    for ok, item in results:
+        op_result = next(iter(item.values()))
+        if ok:
+            success += 1
+            if journal is not None and op_result.get("_index") == raw_index_name:
+                journal.record(op_result["_id"], "raw_stored")
+            continue
+        failed += 1
+        if op_result.get("_index") == raw_index_name:
+            failed_raw.append(op_result.get("_id"))
+        print(
+            f"Error storing {op_result.get('_index')}/{op_result.get('_id')}: "
+            f"{op_result.get('error', op_result.get('exception'))}"
+        )
+    if failed_raw:
+        reset_processed_flags(failed_raw, index_name)
+    print(f"Bulk store: {success} succeeded, {failed} failed")
+    return success, failed
 
 
-def process_json_file(file_path, index_name=PR_META_URL_IDX):
+def process_json_file(
+    file_path,
+    index_name=PR_META_URL_IDX,
+    chunk_size=BULK_CHUNK_SIZE,
+    thread_count=1,
+    journal=None,
+):
     if not os.path.exists(file_path):
         print(f"File not found: {file_path}")
         return
 
-    # Read the JSON file
-    with open(file_path, "r") as file:
-        data = json.load(file)
+    # Stream records so memory stays flat regardless of corpus size
+    data = iter_records(file_path)
 
     # Add processed flag
     updated_data = add_processed_flag(data)
 
     # Store the data in OpenSearch
-    store_in_opensearch(updated_data, index_name)
+    store_in_opensearch(
+        updated_data,
+        index_name,
+        chunk_size=chunk_size,
+        thread_count=thread_count,
+        journal=journal,
+    )
 
 
 if __name__ == "__main__":
-    file_path = "press_releases.json"
+    parser = argparse.ArgumentParser(description="Stage crawled press releases in OpenSearch")
+    parser.add_argument("file_path", nargs="?", default=PRESS_RELEASES_FILE)
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
     index_body = {"settings": {"index": {"number_of_shards": 2}}}
     try:
         response = client.indices.create(PR_META_URL_IDX, body=index_body)
     except Exception as e:
         print(f"Error creating index: {e}")
-    process_json_file(file_path)
+    process_json_file(
+        args.file_path,
+        chunk_size=args.chunk_size,
+        thread_count=args.threads,
+        journal=CheckpointJournal(CHECKPOINT_DB),
+    )
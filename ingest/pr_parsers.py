@@ -0,0 +1,135 @@
+import os
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+
+PRESS_RELEASE_PREFIX = "/media-center/press-releases/"
+PAGE_CONTENT_CLASS = "page__content evo-page-content"
+DATE_CLASS = "col-auto"
+BODY_CLASS = "evo-press-release__body"
+PARSER_PREFERENCE = ["selectolax", "lxml", "bs4"]
+
+
+# Every backend exposes the same two functions:
+#   links(html) -> list of press-release hrefs found on a listing page
+#   fields(html) -> (title, date_text, body_text), each None when missing
+# and raises ValueError when the page has no content container at all.
+# Class names are matched as tokens of the class attribute (like CSS ``.a.b``),
+# and the content is the container's first element child.
+
+
+def _css_class(name):
+    return "div" + "".join(f".{token}" for token in name.split())
+
+
+def bs4_links(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return [
+        a["href"]
+        for a in soup.find_all("a", href=True)
+        if a["href"].startswith(PRESS_RELEASE_PREFIX)
+    ]
+
+
+def bs4_fields(html):
+    soup = BeautifulSoup(html, "html.parser")
+    h1 = soup.find("h1")
+    container = soup.select_one(_css_class(PAGE_CONTENT_CLASS))
+    page_content = container.find(True, recursive=False) if container is not None else None
+    if page_content is None:
+        raise ValueError("page content container not found")
+    date_div = page_content.select_one(_css_class(DATE_CLASS))
+    body = page_content.select_one(_css_class(BODY_CLASS))
+    return (
+        h1.text if h1 else None,
+        date_div.text if date_div else None,
+        body.text if body else None,
+    )
+
+
+def _xpath_class(name, prefix=".//"):
+    tokens = " and ".join(
+        f'contains(concat(" ", normalize-space(@class), " "), " {token} ")' for token in name.split()
+    )
+    return f"{prefix}div[{tokens}]"
+
+
+def lxml_links(html):
+    tree = lxml.html.fromstring(html)
+    return tree.xpath(f'//a[starts-with(@href, "{PRESS_RELEASE_PREFIX}")]/@href')
+
+
+def lxml_fields(html):
+    tree = lxml.html.fromstring(html)
+    h1 = tree.find(".//h1")
+    containers = tree.xpath(_xpath_class(PAGE_CONTENT_CLASS, prefix="//"))
+    page_content = containers[0].xpath("*[1]") if containers else None
+    if not page_content:
+        raise ValueError("page content container not found")
+    page_content = page_content[0]
+    date_div = page_content.xpath(_xpath_class(DATE_CLASS))
+    body = page_content.xpath(_xpath_class(BODY_CLASS))
+    return (
+        h1.text_content() if h1 is not None else None,
+        date_div[0].text_content() if date_div else None,
+        body[0].text_content() if body else None,
+    )
+
+
+def selectolax_links(html):
+    tree = HTMLParser(html)
+    return [
+        node.attributes["href"]
+        for node in tree.css(f'a[href^="{PRESS_RELEASE_PREFIX}"]')
+    ]
+
+
+def selectolax_fields(html):
+    tree = HTMLParser(html)
+    h1 = tree.css_first("h1")
+    container = tree.css_first(_css_class(PAGE_CONTENT_CLASS))
+    children = container.iter() if container is not None else ()
+    # iter() skips text nodes but not comments ("_comment", or "-comment" with lexbor)
+    page_content = next((node for node in children if not node.tag.startswith(("_", "-"))), None)
+    if page_content is None:
+        raise ValueError("page content container not found")
+    date_div = page_content.css_first(_css_class(DATE_CLASS))
+    body = page_content.css_first(_css_class(BODY_CLASS))
+    return (
+        h1.text() if h1 is not None else None,
+        date_div.text() if date_div is not None else None,
+        body.text() if body is not None else None,
+    )
+
+
+PARSERS = {"bs4": (bs4_links, bs4_fields)}
+if lxml is not None:
+    PARSERS["lxml"] = (lxml_links, lxml_fields)
+if HTMLParser is not None:
+    PARSERS["selectolax"] = (selectolax_links, selectolax_fields)
+
+
+def get_parser(name=None):
+    """Return the ``(links, fields)`` pair for ``name``, or the fastest installed backend.
+
+    The backend can also be pinned with the ``PR_HTML_PARSER`` environment variable.
+    """
+    name = name or os.environ.get("PR_HTML_PARSER")
+    if name:
+        if name not in PARSERS:
+            raise ValueError(f"HTML parser '{name}' is not available; installed: {list(PARSERS)}")
+        return PARSERS[name]
+    for candidate in PARSER_PREFERENCE:
+        if candidate in PARSERS:
+            return PARSERS[candidate]
@@ -0,0 +1,67 @@
+import gzip
+import json
+import os
+
+PRESS_RELEASES_FILE = "press_releases.jsonl"
+
+
+def _open(path, mode, compressed=None):
+    if path.endswith(".gz") if compressed is None else compressed:
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class RecordWriter:
+    """Append records to a JSONL file (gzip-compressed when the path ends in .gz).
+
+    Each record is flushed as soon as it is written, so an interrupted crawl
+    keeps everything fetched up to that point. Appending to an existing .gz file
+    adds a new gzip member, which ``iter_records`` reads transparently.
+
+    With ``atomic`` (and not ``append``) records go to ``<path>.tmp``, which
+    replaces ``path`` only on ``commit``, so a failed run leaves the previous
+    file intact.
+    """
+
+    def __init__(self, path=PRESS_RELEASES_FILE, append=False, atomic=False):
+        self.path = path
+        self.count = 0
+        self._target = path + ".tmp" if atomic and not append else path
+        self._fp = _open(self._target, "a" if append else "w", compressed=path.endswith(".gz"))
+
+    def write(self, record):
+        self._fp.write(json.dumps(record) + "\n")
+        self._fp.flush()
+        self.count += 1
+
+    def close(self):
+        self._fp.close()
+
+    def commit(self):
+        self.close()
+        if self._target != self.path:
+            os.replace(self._target, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_records(path):
+    """Yield records one at a time from a .jsonl/.jsonl.gz stream or a legacy JSON array."""
+    if path.endswith(".json"):
+        with open(path, "r") as fp:
+            yield from json.load(fp)
+        return
+    with _open(path, "r") as fp:
+        for line_number, line in enumerate(fp, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                # A crash mid-write can leave a truncated final line
+                print(f"Skipping malformed line {line_number} in {path}: {e}")
@@ -1,16 +1,30 @@
 import time
+import concurrent.futures
 import boto3
 from botocore.exceptions import ClientError
 import json
 import logging
+from opensearchpy import helpers
+from utils.bulk_writer import BulkWriter, refresh_disabled
+from utils.checkpoint import CHECKPOINT_DB, CheckpointJournal
+from utils.chunking import CHUNK_OVERLAP_WORDS, CHUNK_WINDOW_WORDS, chunk_text
+from utils.create_vector_index import create_passage_index, create_vector_index
+from utils.doc_ids import content_fingerprint, doc_id_for_url, parent_id_of, passage_id
+from utils.index_aliases import belongs_to, ensure_aliases
 from utils.opensearch import *
+from utils.bedrock import generate_embeddings_batch, invoke_model
+from utils.rate_limit import backoff_delay
+from utils.vector_encoding import as_index_vector, live_encoding
 
 
 MAX_RETRIES = 3
+FINGERPRINT_BATCH_SIZE = 500
 RETRY_DELAY_SECONDS = 10
 client = OS_CLIENT
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-bedrock_client = boto3.client("bedrock-runtime", region_name="us-east-1")
+ENRICH_WORKERS = 8
+VECTOR_BULK_SIZE = 100
+VECTOR_FLUSH_INTERVAL = 30.0
 
 
 def process_text(text):
@@ -41,7 +55,7 @@ def process_text(text):
     request = json.dumps(native_request)
 
     try:
-        response = bedrock_client.invoke_model(modelId=BASE_MODEL_ID, body=request)
+        response = invoke_model(modelId=BASE_MODEL_ID, body=request)
         response_body = json.loads(response["body"].read().decode("utf-8"))
         model_output_text = response_body.get("text")
 
@@ -98,50 +112,229 @@ def process_text(text):
 
 
 def generate_embeddings(text):
-    try:
-        response = bedrock_client.invoke_model(
-            modelId=EMBEDDING_MODEL_ID,
-            contentType="application/json",
-            accept="application/json",
-            body=json.dumps({"inputText": text, "normalize": True, "dimensions": 256}),
-        )
-        embedding = json.loads(response["body"].read().decode("utf-8"))
-        return embedding["embedding"]
-    except Exception as e:
-        print(f"Error generating embeddings with Titan: {e}")
-        return None
+    return generate_embeddings_batch([text])[0]
+
+
+def indexed_form(document):
+    """``document`` as written to the vector index, its embedding in the index's encoding."""
+    if "embedding" not in document:
+        return document
+    encoding = live_encoding(client, PR_META_VECTOR_WRITE_IDX)
+    return {**document, "embedding": as_index_vector(document["embedding"], encoding)}
 
 
 def store_in_vector_index(document):
     try:
-        response = client.index(index=PR_META_VECTOR_IDX, body=document)
+        response = client.index(
+            index=PR_META_VECTOR_WRITE_IDX,
+            id=doc_id_for_url(document["pr_url"]),
+            body=indexed_form(document),
+        )
         print(f"Document indexed successfully! ID: {response['_id']}")
         return response
     except Exception as e:
         print(f"Error indexing document: {e}")
 
 
-def process_and_store_document(info):
+def document_fingerprint(raw_text):
+    return content_fingerprint(raw_text, BASE_MODEL_ID, EMBEDDING_MODEL_ID)
+
+
+def passage_fingerprint(raw_text):
+    return content_fingerprint(
+        raw_text, EMBEDDING_MODEL_ID, f"chunks:{CHUNK_WINDOW_WORDS}/{CHUNK_OVERLAP_WORDS}"
+    )
+
+
+def fetch_stored_fingerprints(doc_ids, index_name=PR_META_VECTOR_WRITE_IDX):
+    """Return ``{doc_id: {"content_hash", "passage_hash", "has_embedding"}}`` for indexed documents."""
+    fingerprints = {}
+    for start in range(0, len(doc_ids), FINGERPRINT_BATCH_SIZE):
+        batch = doc_ids[start : start + FINGERPRINT_BATCH_SIZE]
+        try:
+            response = client.mget(
+                index=index_name,
+                body={"ids": batch},
+                _source_includes=["content_hash", "passage_hash", "embedding"],
+            )
+        except Exception as e:
+            logging.error(f"Error fetching stored fingerprints: {e}")
+            continue
+        for doc in response.get("docs", []):
+            if doc.get("found"):
+                source = doc.get("_source", {})
+                source["has_embedding"] = bool(source.pop("embedding", None))
+                fingerprints[doc["_id"]] = source
+    return fingerprints
+
+
+def vector_index_action(document, index_name=PR_META_VECTOR_WRITE_IDX):
+    return {
+        "_op_type": "index",
+        "_index": index_name,
+        "_id": doc_id_for_url(document["pr_url"]),
+        "_source": indexed_form(document),
+    }
+
+
+def passage_actions(info, index_name=PR_META_PASSAGE_WRITE_IDX):
+    """Bulk actions for every passage of ``info``, or None if any chunk failed to embed.
+
+    Each chunk is embedded with the release title in front of it, so a passage
+    keeps the context of what the release is about.
+    """
+    doc_id = doc_id_for_url(info["pr_url"])
+    chunks = chunk_text(info["content"])
+    title = info.get("pr_title") or ""
+    vectors = generate_embeddings_batch([f"{title}\n{chunk}".strip() for chunk in chunks])
+    if not all(vectors):
+        return None
+    encoding = live_encoding(client, index_name)
+    return [
+        {
+            "_op_type": "index",
+            "_index": index_name,
+            "_id": passage_id(doc_id, chunk_index),
+            "_source": {
+                "parent_id": doc_id,
+                "chunk_index": chunk_index,
+                "text": chunk,
+                "pr_url": info["pr_url"],
+                "pr_title": info.get("pr_title"),
+                "pr_date": info.get("pr_date"),
+                "embedding": as_index_vector(vector, encoding),
+            },
+        }
+        for chunk_index, (chunk, vector) in enumerate(zip(chunks, vectors))
+    ]
+
+
+def delete_stale_passages(doc_id, keep, index_name=PR_META_PASSAGE_WRITE_IDX):
+    """Drop passages of ``doc_id`` beyond the first ``keep`` (left over when a document shrank)."""
+    try:
+        client.delete_by_query(
+            index=index_name,
+            body={
+                "query": {
+                    "bool": {
+                        "filter": [
+                            {"term": {"parent_id": doc_id}},
+                            {"range": {"chunk_index": {"gte": keep}}},
+                        ]
+                    }
+                }
+            },
+        )
+    except Exception as e:
+        logging.error(f"Error deleting stale passages of {doc_id}: {e}")
+
+
+def store_passages(info, writer=None, replace=False):
+    """Chunk, embed and index the passages of one document; returns its passage_hash or None.
+
+    With ``replace`` the document was indexed before, so passages past the new
+    chunk count are deleted. IDs are positional, so the rest are overwritten.
+    """
+    actions = passage_actions(info)
+    if actions is None:
+        logging.error(f"Failed to embed passages for URL: {info['pr_url']}")
+        return None
+    if replace:
+        delete_stale_passages(doc_id_for_url(info["pr_url"]), len(actions))
+    if writer is not None:
+        writer.add(*actions)
+    else:
+        try:
+            _, errors = helpers.bulk(client, actions, raise_on_error=False)
+        except Exception as e:
+            logging.error(f"Error indexing passages for URL {info['pr_url']}: {e}")
+            return None
+        if errors:
+            logging.error(f"{len(errors)} passages failed to index for URL: {info['pr_url']}")
+            return None
+    return passage_fingerprint(info["content"])
+
+
+def refresh_passages(info, writer=None):
+    """Rebuild only the passages of an already enriched document (chunking or model changed)."""
+    passage_hash = store_passages(info, writer, replace=True)
+    if not passage_hash:
+        return False
+    action = {
+        "_op_type": "update",
+        "_index": PR_META_VECTOR_WRITE_IDX,
+        "_id": doc_id_for_url(info["pr_url"]),
+        "doc": {"passage_hash": passage_hash},
+    }
+    if writer is not None:
+        writer.add(action)
+        return True
+    try:
+        client.update(index=action["_index"], id=action["_id"], body={"doc": action["doc"]})
+        return True
+    except Exception as e:
+        logging.error(f"Error updating passage_hash for URL {info['pr_url']}: {e}")
+        return False
+
+
+def process_and_store_document(info, journal=None, writer=None, replace_passages=False):
+    """Enrich, embed and index one raw document, resuming from its last checkpoint.
+
+    The journal keeps the enriched document, so a restart never repeats a
+    Bedrock call that already succeeded. The document and its passages are
+    stored under URL-derived IDs (queued on ``writer`` when one is given).
+    Returns the stored document, or None on failure.
+    """
     raw_text = info["content"]
     pr_url = info["pr_url"]
-    pr_title = info["pr_title"]
-    pr_date = info["pr_date"]
-    document = process_text(raw_text)
-    if document:
+    doc_id = doc_id_for_url(pr_url)
+    fingerprint = document_fingerprint(raw_text)
+
+    document = None
+    if journal is not None and journal.reached(doc_id, "enriched"):
+        document = journal.load_payload(doc_id)
+        if document and document.get("content_hash") != fingerprint:
+            document = None
+    if not document:
+        document = process_text(raw_text)
+        if not document:
+            return None
         document["pr_url"] = pr_url
-        document["pr_title"] = pr_title
-        document["pr_date"] = pr_date
+        document["pr_title"] = info["pr_title"]
+        document["pr_date"] = info["pr_date"]
         document["pr_content"] = info["content"]
+        document["content_hash"] = fingerprint
+        if journal is not None:
+            journal.record(doc_id, "enriched", pr_url=pr_url, payload=document)
+
+    if "embedding" not in document:
         # Generate embeddings
         embedding = generate_embeddings(raw_text)
 
-        if embedding:
-            # Prepare document for indexing in OpenSearch vector index
-            document["embedding"] = embedding
+        if not embedding:
+            # Indexing without it would store the fingerprints and skip the document for good
+            logging.error(f"No embedding generated for {pr_url}")
+            return None
+        # Prepare document for indexing in OpenSearch vector index
+        document["embedding"] = embedding
+        if journal is not None:
+            journal.record(doc_id, "embedded", pr_url=pr_url, payload=document)
+
+    if document.get("passage_hash") != passage_fingerprint(raw_text):
+        passage_hash = store_passages(info, writer, replace=replace_passages)
+        if not passage_hash:
+            return None
+        document["passage_hash"] = passage_hash
 
-        # Store document in OpenSearch vector index
-        store_in_vector_index(document)
+    # Store document in OpenSearch vector index
+    if writer is not None:
+        writer.add(vector_index_action(document))
         return document
+    if not store_in_vector_index(document):
+        return None
+    if journal is not None:
+        journal.record(doc_id, "vector_stored", pr_url=pr_url)
+    return document
 
 
 def search_content_by_url(url, index_name=PR_META_RAW_IDX):
@@ -210,7 +403,45 @@ def search_content_for_month(year: int, month: int, index_name: str = PR_META_RA
         return []
 
 
-def process_single_month_with_retry(year: int, month: int):
+def process_document_with_retry(
+    data, journal=None, label="", writer=None, replace_passages=False, passages_only=False
+):
+    pr_url = data["pr_url"]
+    logging.info(f"--- Processing document {label}: {pr_url} ---")
+    for attempts in range(1, MAX_RETRIES + 1):
+        logging.info(f"Attempt {attempts}/{MAX_RETRIES} for URL: {pr_url}")
+        try:
+            # This function now contains all steps: LLM, Embed, Store
+            if passages_only:
+                stored = refresh_passages(data, writer)
+            else:
+                stored = process_and_store_document(data, journal, writer, replace_passages)
+            if stored:
+                logging.info(f"Successfully processed and stored URL: {pr_url} ({label})")
+                return True
+            failure = "failed"
+        except Exception as e:
+            logging.error(
+                f"Unexpected exception during attempt {attempts} for {pr_url}: {e}",
+                exc_info=True,
+            )
+            failure = "failed unexpectedly"
+        if attempts < MAX_RETRIES:
+            delay = backoff_delay(attempts, base=RETRY_DELAY_SECONDS)
+            logging.warning(
+                f"Attempt {attempts} {failure} for {pr_url}. Retrying in {delay:.1f}s..."
+            )
+            time.sleep(delay)
+    return False
+
+
+def process_single_month_with_retry(year: int, month: int, journal=None, workers=ENRICH_WORKERS):
+    """Enrich one month of raw documents with ``workers`` concurrent threads.
+
+    All workers share ``bedrock_limiter``, which backs off on Bedrock throttling
+    and ramps back up as calls succeed. Enriched documents are written to the
+    vector index through one ``BulkWriter`` flushed by size and age.
+    """
     logging.info(f"=== Starting processing for {year}-{month:02d} ===")
     documents_to_process = search_content_for_month(
         year, month, index_name=PR_META_RAW_IDX
@@ -225,59 +456,112 @@ def process_single_month_with_retry(year: int, month: int):
     permanently_failed_urls = []
     processed_count = 0
     failed_count = 0
+    skipped_count = 0
     total_docs = len(documents_to_process)
+    stored_fingerprints = fetch_stored_fingerprints(
+        [
+            doc_id_for_url(hit["_source"]["pr_url"])
+            for hit in documents_to_process
+            if hit.get("_source", {}).get("pr_url")
+        ]
+    )
 
-    for idx, doc_hit in enumerate(documents_to_process):
-        data = doc_hit.get("_source")
-        pr_url = data.get("pr_url") if data else None
+    url_by_id = {}
+    failed_writes = []
+    failed_passage_parents = set()
 
-        if not data or not pr_url:
-            logging.warning(
-                f"Skipping hit {idx+1}/{total_docs} due to missing _source or pr_url. Doc ID: {doc_hit.get('_id')}"
-            )
-            continue
+    def record_stored(actions):
+        stored_ids = [
+            action["_id"] for action in actions if action["_index"] == PR_META_VECTOR_WRITE_IDX
+        ]
+        if journal is not None and stored_ids:
+            journal.record_many(stored_ids, "vector_stored")
+
+    def record_failed(items):
+        for item in items:
+            if belongs_to(item.get("_index"), PR_META_PASSAGE_IDX):
+                failed_passage_parents.add(parent_id_of(item.get("_id", "")))
+            else:
+                failed_writes.append(url_by_id.get(item.get("_id")))
+
+    writer = BulkWriter(
+        client,
+        flush_size=VECTOR_BULK_SIZE,
+        flush_interval=VECTOR_FLUSH_INTERVAL,
+        on_failure=record_failed,
+        on_success=record_stored,
+    )
 
-        logging.info(f"--- Processing document {idx+1}/{total_docs}: {pr_url} ---")
-        success = False
-        attempts = 0
-        while attempts < MAX_RETRIES and not success:
-            attempts += 1
-            logging.info(f"Attempt {attempts}/{MAX_RETRIES} for URL: {pr_url}")
-            try:
-                # This function now contains all steps: LLM, Embed, Store
-                success = process_and_store_document(data)
-                if success:
-                    logging.info(
-                        f"Successfully processed and stored URL: {pr_url} (Doc {idx+1}/{total_docs})"
-                    )
-                else:
-                    if attempts < MAX_RETRIES:
-                        logging.warning(
-                            f"Attempt {attempts} failed for {pr_url}. Retrying in {RETRY_DELAY_SECONDS}s..."
-                        )
-                        time.sleep(RETRY_DELAY_SECONDS)
-            except Exception as e:
-                logging.error(
-                    f"Unexpected exception during attempt {attempts} for {pr_url}: {e}",
-                    exc_info=True,
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        future_to_url = {}
+        for idx, doc_hit in enumerate(documents_to_process):
+            data = doc_hit.get("_source")
+            pr_url = data.get("pr_url") if data else None
+
+            if not data or not pr_url:
+                logging.warning(
+                    f"Skipping hit {idx+1}/{total_docs} due to missing _source or pr_url. Doc ID: {doc_hit.get('_id')}"
                 )
-                success = False
-                if attempts < MAX_RETRIES:
-                    logging.warning(
-                        f"Attempt {attempts} failed unexpectedly for {pr_url}. Retrying in {RETRY_DELAY_SECONDS}s..."
-                    )
-                    time.sleep(RETRY_DELAY_SECONDS)
-        if success:
-            processed_count += 1
-        else:
-            logging.error(
-                f"All {MAX_RETRIES} attempts failed for URL: {pr_url} (Doc {idx+1}/{total_docs})"
+                continue
+
+            stored = stored_fingerprints.get(doc_id_for_url(pr_url))
+            unchanged = (
+                bool(stored)
+                and stored.get("has_embedding")
+                and stored.get("content_hash") == document_fingerprint(data["content"])
+            )
+            if unchanged and stored.get("passage_hash") == passage_fingerprint(data["content"]):
+                skipped_count += 1
+                continue
+
+            url_by_id[doc_id_for_url(pr_url)] = pr_url
+            future = executor.submit(
+                process_document_with_retry,
+                data,
+                journal,
+                f"Doc {idx+1}/{total_docs}",
+                writer,
+                replace_passages=bool(stored),
+                passages_only=unchanged,
             )
+            future_to_url[future] = pr_url
+
+        for future in concurrent.futures.as_completed(future_to_url):
+            pr_url = future_to_url[future]
+            if future.result():
+                processed_count += 1
+                continue
+            logging.error(f"All {MAX_RETRIES} attempts failed for URL: {pr_url}")
             failed_count += 1
             permanently_failed_urls.append(pr_url)
+            if journal is not None:
+                journal.record_failure(
+                    doc_id_for_url(pr_url), "vector_stored", "retries exhausted", pr_url=pr_url
+                )
+
+    writer.close()
+    for doc_id in failed_passage_parents:
+        failed_writes.append(url_by_id.get(doc_id))
+        # Clear the marker so the next run rebuilds this document's passages
+        try:
+            client.update(
+                index=PR_META_VECTOR_WRITE_IDX, id=doc_id, body={"doc": {"passage_hash": None}}
+            )
+        except Exception as e:
+            logging.error(f"Error resetting passage_hash of {doc_id}: {e}")
+    for pr_url in filter(None, dict.fromkeys(failed_writes)):
+        logging.error(f"Bulk write failed for URL: {pr_url}")
+        processed_count -= 1
+        failed_count += 1
+        permanently_failed_urls.append(pr_url)
+        if journal is not None:
+            journal.record_failure(
+                doc_id_for_url(pr_url), "vector_stored", "bulk write failed", pr_url=pr_url
+            )
 
     logging.info(f"=== Processing for {year}-{month:02d} Complete ===")
     logging.info(f"Total documents found: {total_docs}")
+    logging.info(f"Unchanged since last run (skipped): {skipped_count}")
     logging.info(f"Successfully processed: {processed_count}")
     logging.info(f"Permanently failed after {MAX_RETRIES} retries: {failed_count}")
     if permanently_failed_urls:
@@ -288,10 +572,10 @@ def process_single_month_with_retry(year: int, month: int):
     return permanently_failed_urls
 
 
-def main():
+def run_months(journal):
     for target_year in range(2000, 2010):
         for target_month in range(1, 13):
-            failed_urls = process_single_month_with_retry(target_year, target_month)
+            failed_urls = process_single_month_with_retry(target_year, target_month, journal)
 
             if failed_urls:
                 failure_filename = (
@@ -310,5 +594,21 @@ def main():
                     )
 
 
+def main(backfill=True):
+    """Process every month; with ``backfill`` refresh on the vector and passage indices is disabled meanwhile."""
+    # Writers target the write aliases; without them a write would auto-create
+    # a concrete index with a dynamic mapping that search never reads.
+    ensure_aliases(client, PR_META_VECTOR_IDX, create_vector_index)
+    ensure_aliases(client, PR_META_PASSAGE_IDX, create_passage_index)
+    journal = CheckpointJournal(CHECKPOINT_DB)
+    if backfill:
+        with refresh_disabled(client, PR_META_VECTOR_WRITE_IDX), refresh_disabled(
+            client, PR_META_PASSAGE_WRITE_IDX
+        ):
+            run_months(journal)
+    else:
+        run_months(journal)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,18 @@
+"""Import ``utils`` and ``ingest`` modules without running the packages' ``__init__``.
+
+Both ``__init__`` modules star-import modules that connect to AWS Secrets
+Manager and OpenSearch on import (``utils`` re-exports the Streamlit helpers,
+``ingest`` the OpenSearch loaders). The modules under test need neither.
+"""
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+for package in ("utils", "ingest"):
+    if package not in sys.modules:
+        module = types.ModuleType(package)
+        module.__path__ = [os.path.join(ROOT, package)]
+        sys.modules[package] = module
@@ -0,0 +1,135 @@
+import json
+import types
+import pytest
+
+pytest.importorskip("opensearchpy")
+
+from opensearchpy.exceptions import ConnectionError
+from opensearchpy.serializer import JSONSerializer
+from utils.bulk_writer import BulkWriter, refresh_disabled
+
+
+class FakeClient:
+    """Answers bulk requests like OpenSearch: items name the concrete index behind an alias."""
+
+    def __init__(self, fail_ids=(), concrete=None, error=None):
+        self.fail_ids = set(fail_ids)
+        self.concrete = concrete or {}
+        self.error = error
+        self.requests = 0
+        self.transport = types.SimpleNamespace(serializer=JSONSerializer())
+
+    def bulk(self, body, **kwargs):
+        self.requests += 1
+        if self.error:
+            raise self.error
+        lines = [json.loads(line) for line in body.strip().split("\n")]
+        items = []
+        for line in lines:
+            if len(line) != 1 or next(iter(line)) not in ("index", "create", "update", "delete"):
+                continue  # a document source line
+            op_type, meta = next(iter(line.items()))
+            result = {
+                "_index": self.concrete.get(meta["_index"], meta["_index"]),
+                "_id": meta["_id"],
+                "status": 201,
+            }
+            if meta["_id"] in self.fail_ids:
+                result.update(status=400, error={"type": "mapper_parsing_exception"})
+            items.append({op_type: result})
+        return {"errors": any(i[next(iter(i))]["status"] >= 300 for i in items), "items": items}
+
+
+def action(doc_id, index="docs_write"):
+    return {"_op_type": "index", "_index": index, "_id": doc_id, "_source": {"n": doc_id}}
+
+
+def make_writer(client, **kwargs):
+    calls = {"failed": [], "succeeded": []}
+    writer = BulkWriter(
+        client,
+        flush_size=100,
+        on_failure=lambda items: calls["failed"].extend(item["_id"] for item in items),
+        on_success=lambda actions: calls["succeeded"].extend(a["_id"] for a in actions),
+        **kwargs,
+    )
+    return writer, calls
+
+
+def test_failed_items_never_reach_on_success():
+    client = FakeClient(fail_ids={"a"}, concrete={"docs_write": "docs_v2"})
+    writer, calls = make_writer(client)
+    writer.add(action("a"), action("b"))
+    assert writer.close() == (1, 1)
+    assert calls == {"failed": ["a"], "succeeded": ["b"]}
+
+
+def test_same_id_in_two_indices_is_matched_by_position():
+    client = FakeClient(fail_ids=set())
+    writer, calls = make_writer(client)
+    writer.add(action("x", "raw"), action("x", "urls"))
+    writer.close()
+    assert calls == {"failed": [], "succeeded": ["x", "x"]}
+
+
+def test_transport_error_fails_every_action():
+    client = FakeClient(error=ConnectionError("N/A", "unreachable", None))
+    writer, calls = make_writer(client)
+    writer.add(action("a"), action("b"))
+    assert writer.close() == (0, 2)
+    assert calls == {"failed": ["a", "b"], "succeeded": []}
+
+
+def test_unexpected_error_fails_every_action():
+    client = FakeClient(error=ValueError("boom"))
+    writer, calls = make_writer(client)
+    writer.add(action("a"))
+    assert writer.close() == (0, 1)
+    assert calls["failed"] == ["a"]
+
+
+def test_flushes_by_size():
+    client = FakeClient()
+    writer = BulkWriter(client, flush_size=2)
+    writer.add(action("a"))
+    assert client.requests == 0
+    writer.add(action("b"))
+    assert client.requests == 1
+    writer.close()
+    assert client.requests == 1
+
+
+def test_flush_if_due_waits_for_the_interval():
+    client = FakeClient()
+    writer = BulkWriter(client, flush_size=100, flush_interval=3600)
+    writer.add(action("a"))
+    writer.flush_if_due()
+    assert client.requests == 0
+    writer.flush_interval = 0
+    writer.flush_if_due()
+    assert client.requests == 1
+
+
+class SettingsClient:
+    def __init__(self, interval):
+        self.interval = interval
+        self.puts = []
+        self.indices = self
+
+    def get_settings(self, index, name):
+        index_settings = {"refresh_interval": self.interval} if self.interval else {}
+        return {"docs_v1": {"settings": {"index": index_settings}}}
+
+    def put_settings(self, index, body):
+        self.puts.append(body["index"]["refresh_interval"])
+
+    def refresh(self, index):
+        pass
+
+
+@pytest.mark.parametrize("interval, restored", [("30s", "30s"), (None, None), ("-1", None)])
+def test_refresh_disabled_restores_the_interval(interval, restored):
+    client = SettingsClient(interval)
+    with refresh_disabled(client, "docs_write"):
+        pass
+    assert client.puts == ["-1", restored]
@@ -0,0 +1,49 @@
+from utils.checkpoint import CheckpointJournal
+
+
+def journal(tmp_path):
+    return CheckpointJournal(str(tmp_path / "checkpoints.sqlite3"))
+
+
+def test_stages_never_move_backwards(tmp_path):
+    j = journal(tmp_path)
+    j.record("d1", "embedded")
+    j.record("d1", "fetched")
+    assert j.stage_of("d1") == "embedded"
+    assert j.reached("d1", "enriched")
+    assert not j.reached("d1", "vector_stored")
+    assert j.stage_of("missing") is None
+
+
+def test_later_stage_without_payload_keeps_it(tmp_path):
+    j = journal(tmp_path)
+    j.record("d1", "embedded", pr_url="https://example.com/a", payload={"embedding": [0.1]})
+    j.record_many(["d1"], "vector_stored")
+    assert j.stage_of("d1") == "vector_stored"
+    assert j.load_payload("d1") == {"embedding": [0.1]}
+
+
+def test_new_payload_replaces_the_old_one(tmp_path):
+    j = journal(tmp_path)
+    j.record("d1", "enriched", payload={"summary": "old"})
+    j.record("d1", "embedded", payload={"summary": "new"})
+    assert j.load_payload("d1") == {"summary": "new"}
+
+
+def test_completed_and_failures(tmp_path):
+    j = journal(tmp_path)
+    j.record_many(["d1", "d2"], "raw_stored")
+    j.record("d3", "fetched")
+    j.record_failure("d4", "enriched", "throttled", pr_url="https://example.com/d")
+    assert j.completed("raw_stored") == {"d1", "d2"}
+    assert j.stage_of("d4") is None
+    assert j.failures() == [("d4", "https://example.com/d", "throttled")]
+
+
+def test_journal_survives_reopening(tmp_path):
+    j = journal(tmp_path)
+    j.record("d1", "enriched", payload={"summary": "s"})
+    j.close()
+    reopened = journal(tmp_path)
+    assert reopened.stage_of("d1") == "enriched"
+    assert reopened.load_payload("d1") == {"summary": "s"}
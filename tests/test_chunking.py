@@ -0,0 +1,37 @@
+import pytest
+from utils.chunking import chunk_text
+
+
+def words(n):
+    return " ".join(f"w{i}" for i in range(n))
+
+
+def test_short_text_is_one_passage():
+    assert chunk_text(words(200)) == [words(200)]
+    assert chunk_text("one two", window=5, overlap=1) == ["one two"]
+
+
+def test_windows_overlap():
+    passages = chunk_text(words(10), window=4, overlap=1)
+    assert passages == ["w0 w1 w2 w3", "w3 w4 w5 w6", "w6 w7 w8 w9"]
+
+
+def test_last_window_covers_the_tail():
+    passages = chunk_text(words(450))
+    assert len(passages) == 3
+    assert passages[-1].split()[-1] == "w449"
+    assert all(len(p.split()) <= 200 for p in passages)
+
+
+def test_whitespace_is_collapsed():
+    assert chunk_text("  a\n\nb\tc  ") == ["a b c"]
+
+
+def test_empty_text():
+    assert chunk_text("") == []
+    assert chunk_text(None) == []
+
+
+def test_overlap_must_be_smaller_than_window():
+    with pytest.raises(ValueError):
+        chunk_text("a b c", window=3, overlap=3)
@@ -0,0 +1,40 @@
+from utils.doc_ids import content_fingerprint, doc_id_for_url, normalize_url, parent_id_of, passage_id
+
+URL = "https://larson.house.gov/media-center/press-releases/larson-statement"
+
+
+def test_doc_id_is_stable_and_short():
+    assert doc_id_for_url(URL) == doc_id_for_url(URL)
+    assert len(doc_id_for_url(URL)) == 32
+
+
+def test_equivalent_urls_share_an_id():
+    for variant in (
+        URL + "/",
+        URL + "#top",
+        " " + URL + " ",
+        URL.replace("https://", "http://"),
+        URL.replace("larson.house.gov", "Larson.House.GOV"),
+    ):
+        assert doc_id_for_url(variant) == doc_id_for_url(URL), variant
+
+
+def test_different_urls_differ():
+    assert doc_id_for_url(URL) != doc_id_for_url(URL + "-2")
+    assert doc_id_for_url(URL) != doc_id_for_url(URL + "?page=2")
+
+
+def test_normalize_url_keeps_root_path():
+    assert normalize_url("https://larson.house.gov") == "https://larson.house.gov/"
+
+
+def test_passage_ids_round_trip():
+    doc_id = doc_id_for_url(URL)
+    assert parent_id_of(passage_id(doc_id, 0)) == doc_id
+    assert parent_id_of(passage_id(doc_id, 12)) == doc_id
+
+
+def test_content_fingerprint_salts():
+    text = "Larson  announces\nfunding"
+    assert content_fingerprint(text) == content_fingerprint("Larson announces funding")
+    assert content_fingerprint(text, "model-a") != content_fingerprint(text, "model-b")
@@ -0,0 +1,57 @@
+import pytest
+from utils.fusion import RRF_K, fuse_results
+
+
+def hit(url, score):
+    return {"pr_url": url, "score": score}
+
+
+LEXICAL = [hit("a", 12.0), hit("b", 8.0), hit("c", 2.0)]
+SEMANTIC = [hit("b", 0.9), hit("d", 0.8), hit("a", 0.7)]
+
+
+def urls(results):
+    return [doc["pr_url"] for doc in results]
+
+
+def test_rrf_rewards_agreement():
+    fused = fuse_results([LEXICAL, SEMANTIC], "rrf")
+    # b is 2nd and 1st, a is 1st and 3rd; c and d were found by one leg only
+    assert urls(fused) == ["b", "a", "d", "c"]
+    assert fused[0]["score"] == pytest.approx((1 / (RRF_K + 2) + 1 / (RRF_K + 1)) * (RRF_K + 1) / 2)
+
+
+def test_rrf_scores_are_scaled_to_one():
+    fused = fuse_results([LEXICAL, LEXICAL], "rrf")
+    assert fused[0]["score"] == pytest.approx(1.0)
+    assert fused[1]["score"] == pytest.approx((RRF_K + 1) / (RRF_K + 2))
+
+
+def test_rrf_weights():
+    fused = fuse_results([LEXICAL, SEMANTIC], "rrf", weights=[0.1, 1.0])
+    assert urls(fused)[0] == "b"
+
+
+def test_weighted_min_max_normalizes_each_leg():
+    fused = fuse_results([LEXICAL, SEMANTIC], "weighted")
+    scores = {doc["pr_url"]: doc["score"] for doc in fused}
+    assert scores["a"] == pytest.approx((1.0 + 0.0) / 2)
+    assert scores["b"] == pytest.approx((0.6 + 1.0) / 2)
+    assert scores["c"] == pytest.approx(0.0)
+    assert urls(fused)[0] == "b"
+    assert all(0.0 <= s <= 1.0 for s in scores.values())
+
+
+def test_documents_are_copied_not_mutated():
+    fuse_results([LEXICAL, SEMANTIC], "rrf")
+    assert LEXICAL[0]["score"] == 12.0
+
+
+def test_empty_legs():
+    assert fuse_results([[], []], "rrf") == []
+    assert urls(fuse_results([[], SEMANTIC], "weighted")) == ["b", "d", "a"]
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        fuse_results([LEXICAL], "RRF")
@@ -0,0 +1,70 @@
+import asyncio
+import os
+
+from ingest import html_cache
+from ingest.html_cache import HtmlCache, read_blob
+
+PAGE = b"<html><body><h1>Release</h1></body></html>"
+
+
+def test_put_then_get(tmp_path):
+    cache = HtmlCache(str(tmp_path))
+    digest = cache.put("https://example.com/a", PAGE)
+    assert cache.get("https://example.com/a") == PAGE
+    assert cache.get("https://example.com/missing") is None
+    assert os.path.basename(cache.path_for("https://example.com/a")).startswith(digest)
+    cache.close()
+
+
+def test_identical_bodies_share_a_blob(tmp_path):
+    cache = HtmlCache(str(tmp_path))
+    cache.put("https://example.com/a", PAGE)
+    cache.put("https://example.com/b", PAGE)
+    assert len(cache) == 2
+    assert cache.path_for("https://example.com/a") == cache.path_for("https://example.com/b")
+    cache.close()
+
+
+def test_refetch_points_url_at_latest_body(tmp_path):
+    cache = HtmlCache(str(tmp_path))
+    cache.put("https://example.com/a", PAGE)
+    cache.put("https://example.com/a", PAGE + b"<!-- updated -->")
+    assert len(cache) == 1
+    assert cache.get("https://example.com/a") == PAGE + b"<!-- updated -->"
+    cache.close()
+
+
+def test_entries_survive_reopen(tmp_path):
+    cache = HtmlCache(str(tmp_path))
+    cache.put("https://example.com/b", PAGE)
+    cache.put("https://example.com/a", PAGE)
+    cache.close()
+
+    cache = HtmlCache(str(tmp_path))
+    entries = cache.entries()
+    assert [url for url, _ in entries] == ["https://example.com/a", "https://example.com/b"]
+    assert all(read_blob(path) == PAGE for _, path in entries)
+    cache.close()
+
+
+def test_gzip_fallback_without_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setattr(html_cache, "zstandard", None)
+    cache = HtmlCache(str(tmp_path))
+    cache.put("https://example.com/a", PAGE)
+    assert cache.path_for("https://example.com/a").endswith(".gz")
+    assert cache.get("https://example.com/a") == PAGE
+    cache.close()
+
+
+def test_put_from_worker_threads(tmp_path):
+    cache = HtmlCache(str(tmp_path))
+
+    async def put_all():
+        await asyncio.gather(
+            *(asyncio.to_thread(cache.put, f"https://example.com/{i}", PAGE + bytes([i % 4])) for i in range(32))
+        )
+
+    asyncio.run(put_all())
+    assert len(cache) == 32
+    assert cache.get("https://example.com/5") == PAGE + bytes([1])
+    cache.close()
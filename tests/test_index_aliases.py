@@ -0,0 +1,24 @@
+from utils.index_aliases import belongs_to, versioned_name, write_alias
+
+VECTORS = "pr_vectors"
+PASSAGES = "pr_vectors_passages"
+
+
+def test_belongs_to_accepts_alias_write_alias_and_versions():
+    assert belongs_to(VECTORS, VECTORS)
+    assert belongs_to(write_alias(VECTORS), VECTORS)
+    assert belongs_to(versioned_name(VECTORS, 1), VECTORS)
+    assert belongs_to(versioned_name(VECTORS, 12), VECTORS)
+
+
+def test_belongs_to_tells_passages_from_vectors():
+    for index_name in (PASSAGES, write_alias(PASSAGES), versioned_name(PASSAGES, 3)):
+        assert belongs_to(index_name, PASSAGES)
+        assert not belongs_to(index_name, VECTORS)
+    assert not belongs_to(write_alias(VECTORS), PASSAGES)
+
+
+def test_belongs_to_rejects_other_names():
+    assert not belongs_to(None, VECTORS)
+    assert not belongs_to("pr_vectors_vx", VECTORS)
+    assert not belongs_to("pr_vectors_v2_old", VECTORS)
@@ -0,0 +1,40 @@
+import math
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("requests")
+pytest.importorskip("bs4")
+
+from ingest.pr_meta_fetch import last_page_search
+
+
+def find_last_page(pages, max_pages):
+    """Run the search against an archive of ``pages`` non-empty pages."""
+    probes = []
+    search = last_page_search(max_pages)
+    try:
+        page = next(search)
+        while True:
+            probes.append(page)
+            page = search.send(page <= pages)
+    except StopIteration as stop:
+        return stop.value, probes
+
+
+@pytest.mark.parametrize("pages", list(range(0, 70)) + [326, 511, 512, 513])
+def test_finds_the_last_page(pages):
+    last_page, probes = find_last_page(pages, max_pages=1000)
+    assert last_page == pages
+    assert len(probes) == len(set(probes))
+    assert len(probes) <= 2 * math.ceil(math.log2(pages + 2)) + 1
+
+
+def test_empty_archive_needs_one_probe():
+    assert find_last_page(0, max_pages=1000) == (0, [1])
+
+
+@pytest.mark.parametrize("pages", [10, 16, 5000])
+def test_stops_at_max_pages(pages):
+    last_page, probes = find_last_page(pages, max_pages=16)
+    assert last_page == min(pages, 16)
+    assert max(probes) <= 16
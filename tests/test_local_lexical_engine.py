@@ -0,0 +1,110 @@
+import json
+import pytest
+
+pytest.importorskip("numpy")
+
+from utils.local_lexical_engine import (
+    FUZZY_MAX_DISTANCE,
+    FUZZY_PREFIX_LENGTH,
+    LocalLexicalEngine,
+    deletes,
+    edit_distance,
+)
+
+DOCUMENTS = [
+    {"pr_title": "Senator budget vote", "pr_content": "The senate passed the budget.", "pr_date": "2023-01-05"},
+    {"pr_title": "Social Security", "pr_content": "Protecting social security for seniors.", "pr_date": "2023-06-01"},
+    {"pr_title": "Infrastructure", "pr_content": "Bridges and roads funding.", "summary": "budget", "pr_date": "2024-02-10"},
+    {"pr_title": "Senate hearing 2024", "pr_content": "A hearing on seniors.", "pr_date": "2024-03-01"},
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    with open(tmp_path / "documents.jsonl", "w") as f:
+        for i, doc in enumerate(DOCUMENTS):
+            f.write(json.dumps({"_id": str(i), **doc}) + "\n")
+    return LocalLexicalEngine(str(tmp_path))
+
+
+@pytest.mark.parametrize(
+    "a, b, expected",
+    [
+        ("senate", "senate", 0),
+        ("senate", "senator", 2),
+        ("senater", "senator", 1),
+        ("budget", "budgte", 2),
+        ("", "abc", 3),
+        ("abc", "", 3),
+    ],
+)
+def test_edit_distance(a, b, expected):
+    assert edit_distance(a, b, limit=5) == expected
+
+
+def test_edit_distance_stops_past_the_limit():
+    assert edit_distance("senate", "security", limit=2) == 3
+    assert edit_distance("a", "abcdef", limit=2) == 3
+
+
+def test_deletes():
+    assert deletes("abc", 0) == {"abc"}
+    assert deletes("abc", 1) == {"abc", "bc", "ac", "ab"}
+    assert deletes("abc", 2) == {"abc", "bc", "ac", "ab", "a", "b", "c"}
+    assert "" in deletes("ab", 2)
+
+
+def test_deletes_only_touch_the_prefix():
+    term = "infrastructure"
+    variants = deletes(term, 1)
+    assert all(len(v) >= FUZZY_PREFIX_LENGTH - 1 for v in variants)
+    assert term[:FUZZY_PREFIX_LENGTH] in variants
+    assert term not in variants
+
+
+def test_expand_exact(engine):
+    assert engine.expand("budget") == [(engine.term_ids["budget"], 0)]
+    assert engine.expand("budgte") == []
+
+
+def test_expand_fuzzy(engine):
+    matches = dict(engine.expand("senater", fuzziness=1))
+    assert matches == {engine.term_ids["senator"]: 1, engine.term_ids["senate"]: 1}
+    matches = dict(engine.expand("budgte", fuzziness=2))
+    assert matches == {engine.term_ids["budget"]: 2}
+
+
+def test_expand_orders_by_distance(engine):
+    matches = engine.expand("senate", fuzziness=2)
+    assert matches[0] == (engine.term_ids["senate"], 0)
+    assert [d for _, d in matches] == sorted(d for _, d in matches)
+
+
+def test_expand_caps_fuzziness(engine):
+    assert engine.expand("budgte", fuzziness=5) == engine.expand("budgte", fuzziness=FUZZY_MAX_DISTANCE)
+
+
+def test_expand_never_fuzzes_numbers(engine):
+    assert engine.expand("2025", fuzziness=2) == []
+    assert engine.expand("2024", fuzziness=2) == [(engine.term_ids["2024"], 0)]
+
+
+def test_search_ranks_title_matches_first(engine):
+    results = engine.search("senate", k=10)
+    assert [r["pr_title"] for r in results] == ["Senate hearing 2024", "Senator budget vote"]
+    assert "_id" not in results[0]
+
+
+def test_search_fuzzy_and_date_filter(engine):
+    assert engine.search("secruity") == []
+    assert engine.search("secruity", fuzziness=2)[0]["pr_title"] == "Social Security"
+    results = engine.search("budget", start_date="2024-01-01")
+    assert [r["pr_title"] for r in results] == ["Infrastructure"]
+
+
+def test_index_is_cached(engine, tmp_path):
+    reloaded = LocalLexicalEngine(str(tmp_path))
+    assert reloaded.vocabulary == engine.vocabulary
+    assert [r["pr_title"] for r in reloaded.search("seniors")] == [
+        r["pr_title"] for r in engine.search("seniors")
+    ]
@@ -0,0 +1,55 @@
+import json
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from utils.local_vector_engine import LocalVectorEngine, get_local_vector_engine
+
+VECTORS = [
+    [1.0, 0.0, 0.0],
+    [0.8, 0.6, 0.0],
+    [0.0, 1.0, 0.0],
+    [0.0, 0.0, 1.0],
+]
+DOCUMENTS = [
+    {"pr_title": "Budget", "pr_date": "2023-01-05"},
+    {"pr_title": "Budget hearing", "pr_date": "2023-06-01"},
+    {"pr_title": "Infrastructure", "pr_date": "2024-02-10"},
+    {"pr_title": "Undated"},
+]
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path):
+    np.asarray(VECTORS, dtype=np.float32).tofile(tmp_path / "vectors.f32")
+    with open(tmp_path / "documents.jsonl", "w") as f:
+        for i, doc in enumerate(DOCUMENTS):
+            f.write(json.dumps({"_id": str(i), **doc}) + "\n")
+    with open(tmp_path / "meta.json", "w") as f:
+        json.dump({"count": len(VECTORS), "dimension": 3}, f)
+    return str(tmp_path)
+
+
+def test_top_k_ranks_by_cosine(snapshot_dir):
+    engine = LocalVectorEngine(snapshot_dir)
+    results = engine.top_k([2.0, 0.0, 0.0], k=3)
+    assert [row for row, _ in results] == [0, 1, 2]
+    assert [score for _, score in results] == pytest.approx([1.0, 0.8, 0.0])
+
+
+def test_top_k_applies_the_date_range(snapshot_dir):
+    engine = LocalVectorEngine(snapshot_dir)
+    results = engine.top_k([1.0, 0.0, 0.0], k=10, start_date="2023-03-01", end_date="2024-12-31")
+    assert [row for row, _ in results] == [1, 2]
+    assert engine.top_k([1.0, 0.0, 0.0], start_date="2030-01-01") == []
+
+
+def test_search_returns_sources_with_opensearch_scores(snapshot_dir):
+    engine = LocalVectorEngine(snapshot_dir)
+    results = engine.search([0.0, 0.0, 1.0], k=1)
+    assert results == [{"pr_title": "Undated", "score": pytest.approx(1.0)}]
+    assert engine.search([-1.0, 0.0, 0.0], k=1)[0]["score"] == pytest.approx(0.5)
+
+
+def test_engine_is_shared_per_snapshot(snapshot_dir):
+    assert get_local_vector_engine(snapshot_dir) is get_local_vector_engine(snapshot_dir)
@@ -0,0 +1,77 @@
+import pytest
+
+from ingest import pr_parsers
+from ingest.pr_parsers import PARSERS, get_parser
+
+LISTING = b"""<html><body>
+<a href="/media-center/press-releases/first">First</a>
+<a href="/about">About</a>
+<a href="/media-center/press-releases/second">Second</a>
+<a>No href</a>
+</body></html>"""
+
+DETAIL = b"""<html><body>
+<h1>Larson Statement</h1>
+<div class="wrapper page__content evo-page-content extra">
+  <!-- rendered by the CMS -->
+  <div class="evo-inner">
+    <div class="row col-auto">March 3, 2024</div>
+    <div class="evo-press-release__body"><p>Today I said <b>this</b>.</p></div>
+  </div>
+  <div class="evo-press-release__body">Outside the first child</div>
+</div>
+</body></html>"""
+
+NO_CONTAINER = b"<html><body><h1>Not a release</h1><div class='page__content'>x</div></body></html>"
+
+
+def normalize(fields):
+    return tuple(" ".join(value.split()) if value else None for value in fields)
+
+
+@pytest.fixture(params=sorted(PARSERS))
+def backend(request):
+    return PARSERS[request.param]
+
+
+def test_links_keep_only_press_releases(backend):
+    links, _ = backend
+    assert sorted(links(LISTING)) == [
+        "/media-center/press-releases/first",
+        "/media-center/press-releases/second",
+    ]
+
+
+def test_fields_read_the_first_element_child(backend):
+    _, fields = backend
+    assert normalize(fields(DETAIL)) == ("Larson Statement", "March 3, 2024", "Today I said this.")
+
+
+def test_missing_fields_are_none(backend):
+    _, fields = backend
+    html = b'<html><body><div class="page__content evo-page-content"><div></div></div></body></html>'
+    assert fields(html) == (None, None, None)
+
+
+def test_missing_container_raises(backend):
+    _, fields = backend
+    with pytest.raises(ValueError):
+        fields(NO_CONTAINER)
+
+
+def test_backends_agree():
+    results = {name: normalize(fields(DETAIL)) for name, (_, fields) in PARSERS.items()}
+    assert len(set(results.values())) == 1, results
+
+
+def test_get_parser_prefers_fastest_installed(monkeypatch):
+    monkeypatch.delenv("PR_HTML_PARSER", raising=False)
+    preferred = next(name for name in pr_parsers.PARSER_PREFERENCE if name in PARSERS)
+    assert get_parser() is PARSERS[preferred]
+
+
+def test_get_parser_honours_environment(monkeypatch):
+    monkeypatch.setenv("PR_HTML_PARSER", "bs4")
+    assert get_parser() is PARSERS["bs4"]
+    with pytest.raises(ValueError):
+        get_parser("html5lib")
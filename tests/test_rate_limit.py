@@ -0,0 +1,111 @@
+import types
+
+import pytest
+
+from utils import rate_limit
+from utils.rate_limit import AdaptiveRateLimiter, backoff_delay, call_with_backoff, is_throttling_error
+
+
+class ServiceError(Exception):
+    def __init__(self, code=None):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}} if code else None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", types.SimpleNamespace(monotonic=clock.monotonic, sleep=clock.sleep))
+    return clock
+
+
+def test_is_throttling_error():
+    assert is_throttling_error(ServiceError("ThrottlingException"))
+    assert not is_throttling_error(ServiceError("ValidationException"))
+    assert not is_throttling_error(ServiceError())
+    assert not is_throttling_error(ValueError("boom"))
+
+
+def test_backoff_delay_is_capped(monkeypatch):
+    monkeypatch.setattr(rate_limit, "random", types.SimpleNamespace(uniform=lambda low, high: high))
+    assert backoff_delay(0) == 1.0
+    assert backoff_delay(3) == 8.0
+    assert backoff_delay(10, cap=60.0) == 60.0
+
+
+def test_acquire_spends_burst_then_waits_for_refill(clock):
+    limiter = AdaptiveRateLimiter(rate=2.0, burst=2)
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.sleeps == []
+    limiter.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_rate_increases_additively_and_decreases_multiplicatively(clock):
+    limiter = AdaptiveRateLimiter(rate=4.0, min_rate=1.0, max_rate=4.1, increase=0.05, decrease=0.5)
+    limiter.on_success()
+    limiter.on_success()
+    limiter.on_success()
+    assert limiter.rate == pytest.approx(4.1)
+    limiter.on_throttle()
+    assert limiter.rate == pytest.approx(2.05)
+    limiter.on_throttle()
+    limiter.on_throttle()
+    assert limiter.rate == 1.0
+
+
+def test_throttle_drains_the_bucket(clock):
+    limiter = AdaptiveRateLimiter(rate=2.0, burst=2, decrease=0.5)
+    limiter.on_throttle()
+    limiter.acquire()
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+
+def test_call_with_backoff_retries_throttling(clock):
+    limiter = AdaptiveRateLimiter(rate=5.0)
+    calls = []
+
+    def flaky(**kwargs):
+        calls.append(kwargs)
+        if len(calls) < 3:
+            raise ServiceError("ThrottlingException")
+        return "ok"
+
+    assert call_with_backoff(flaky, limiter, body="x") == "ok"
+    assert calls == [{"body": "x"}] * 3
+    assert limiter.rate < 5.0
+
+
+def test_call_with_backoff_reraises_other_errors(clock):
+    def broken():
+        raise ServiceError("ValidationException")
+
+    with pytest.raises(ServiceError):
+        call_with_backoff(broken)
+    assert clock.sleeps == []
+
+
+def test_call_with_backoff_gives_up(clock):
+    calls = []
+
+    def throttled():
+        calls.append(1)
+        raise ServiceError("TooManyRequestsException")
+
+    with pytest.raises(ServiceError):
+        call_with_backoff(throttled, max_attempts=3)
+    assert len(calls) == 3
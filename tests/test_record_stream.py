@@ -0,0 +1,66 @@
+import json
+import os
+
+from ingest.record_stream import RecordWriter, iter_records
+
+RECORDS = [{"pr_url": f"https://example.com/{i}", "pr_title": f"Release {i}"} for i in range(3)]
+
+
+def test_write_then_read_jsonl(tmp_path):
+    path = str(tmp_path / "out.jsonl")
+    with RecordWriter(path) as writer:
+        for record in RECORDS:
+            writer.write(record)
+    assert writer.count == 3
+    assert list(iter_records(path)) == RECORDS
+
+
+def test_gzip_append_adds_a_readable_member(tmp_path):
+    path = str(tmp_path / "out.jsonl.gz")
+    with RecordWriter(path) as writer:
+        writer.write(RECORDS[0])
+    with RecordWriter(path, append=True) as writer:
+        for record in RECORDS[1:]:
+            writer.write(record)
+    assert list(iter_records(path)) == RECORDS
+
+
+def test_atomic_writer_replaces_only_on_commit(tmp_path):
+    path = str(tmp_path / "out.jsonl")
+    with open(path, "w") as fp:
+        fp.write(json.dumps({"old": True}) + "\n")
+
+    writer = RecordWriter(path, atomic=True)
+    writer.write(RECORDS[0])
+    writer.close()
+    assert list(iter_records(path)) == [{"old": True}]
+
+    writer = RecordWriter(path, atomic=True)
+    writer.write(RECORDS[0])
+    writer.commit()
+    assert list(iter_records(path)) == [RECORDS[0]]
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_atomic_is_ignored_when_appending(tmp_path):
+    path = str(tmp_path / "out.jsonl")
+    with RecordWriter(path) as writer:
+        writer.write(RECORDS[0])
+    writer = RecordWriter(path, append=True, atomic=True)
+    writer.write(RECORDS[1])
+    writer.commit()
+    assert list(iter_records(path)) == RECORDS[:2]
+
+
+def test_truncated_last_line_is_skipped(tmp_path):
+    path = str(tmp_path / "out.jsonl")
+    with open(path, "w") as fp:
+        fp.write(json.dumps(RECORDS[0]) + "\n\n" + '{"pr_url": "https://exa')
+    assert list(iter_records(path)) == [RECORDS[0]]
+
+
+def test_legacy_json_array(tmp_path):
+    path = str(tmp_path / "press_releases.json")
+    with open(path, "w") as fp:
+        json.dump(RECORDS, fp)
+    assert list(iter_records(path)) == RECORDS
@@ -0,0 +1,60 @@
+import pytest
+from utils import vector_encoding
+from utils.index_profiles import INDEX_PROFILES, embedding_field, get_profile
+from utils.vector_encoding import as_index_vector, live_encoding, mapping_encoding, quantize_int8
+
+
+class MappingClient:
+    def __init__(self, field=None):
+        self.field = field
+        self.calls = 0
+        self.indices = self
+
+    def get_mapping(self, index):
+        self.calls += 1
+        if self.field is None:
+            raise ConnectionError("unreachable")
+        return {f"{index}_v1": {"mappings": {"properties": {"embedding": self.field}}}}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    vector_encoding._live_encodings.clear()
+
+
+@pytest.mark.parametrize("name", list(INDEX_PROFILES))
+def test_mapping_encoding_matches_the_profile(name):
+    profile = get_profile(name)
+    assert mapping_encoding(embedding_field(256, profile)) == profile["encoding"]
+
+
+def test_live_encoding_reads_the_alias_mapping_and_caches_it():
+    client = MappingClient(embedding_field(256, get_profile("byte")))
+    assert live_encoding(client, "docs_write") == "byte"
+    assert live_encoding(client, "docs_write") == "byte"
+    assert client.calls == 1
+
+
+def test_live_encoding_notices_a_swap_after_the_ttl(monkeypatch):
+    client = MappingClient(embedding_field(256, get_profile("default")))
+    assert live_encoding(client, "docs") == "float"
+    client.field = embedding_field(256, get_profile("byte"))
+    monkeypatch.setattr(vector_encoding, "ENCODING_TTL_SECONDS", 0)
+    assert live_encoding(client, "docs") == "byte"
+
+
+def test_live_encoding_falls_back_to_the_configured_encoding():
+    assert live_encoding(MappingClient(None), "docs") == vector_encoding.VECTOR_ENCODING
+
+
+def test_quantize_int8():
+    assert quantize_int8([0.5, -1.0, 0.25]) == [64, -127, 32]
+    assert quantize_int8([0.0, 0.0]) == [0, 0]
+
+
+def test_as_index_vector():
+    vector = [0.1, -0.2]
+    assert as_index_vector(vector, "float") is vector
+    assert as_index_vector(vector, "fp16") is vector
+    assert as_index_vector(vector, "byte") == [64, -127]
+    assert as_index_vector(None, "byte") is None
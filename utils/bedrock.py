@@ -1,12 +1,45 @@
 import boto3
+import concurrent.futures
 import json
 import logging
 from botocore.exceptions import ClientError
 from utils.constants import *
+from utils.embedding_cache import (
+    EMBEDDING_CACHE_DB,
+    EmbeddingCache,
+    RedisVectorCache,
+    TTLCache,
+    text_hash,
+)
+from utils.local_embeddings import embed_local, is_local_model
+from utils.rate_limit import AdaptiveRateLimiter, call_with_backoff
 
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 bedrock_client = boto3.client("bedrock-runtime", region_name="us-east-1")
+EMBEDDING_DIMENSIONS = 256
+EMBEDDING_WORKERS = 8
+COHERE_EMBED_BATCH_SIZE = 96
+# Cohere embeds documents and queries differently; Titan ignores the distinction
+SEARCH_DOCUMENT = "search_document"
+SEARCH_QUERY = "search_query"
+BEDROCK_REQUESTS_PER_SECOND = 5.0
+bedrock_limiter = AdaptiveRateLimiter(rate=BEDROCK_REQUESTS_PER_SECOND)
+# Search queries get their own bucket so a running backfill never queues them
+QUERY_REQUESTS_PER_SECOND = 20.0
+query_limiter = AdaptiveRateLimiter(rate=QUERY_REQUESTS_PER_SECOND)
+_embedding_cache = None
+QUERY_CACHE_SIZE = 4096
+QUERY_CACHE_TTL_SECONDS = 6 * 3600
+query_embedding_cache = TTLCache(maxsize=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL_SECONDS)
+shared_query_cache = None
+if credentials.get("QUERY_CACHE_REDIS_URL"):
+    try:
+        shared_query_cache = RedisVectorCache(
+            credentials["QUERY_CACHE_REDIS_URL"], ttl=QUERY_CACHE_TTL_SECONDS
+        )
+    except Exception as e:
+        logging.warning(f"Shared query-embedding cache unavailable: {e}")
 
 
 def engage_llm(prompt):
@@ -32,18 +65,160 @@ def engage_llm(prompt):
         print(e)
         return None
     
-def generate_embeddings(text, model_id=EMBEDDING_MODEL_ID):
-    try:
-        response = bedrock_client.invoke_model(
-            modelId=model_id,
-            contentType="application/json",
-            accept="application/json",
-            body=json.dumps({"inputText": text, "normalize": True, "dimensions": 256}),
-        )
-        embedding = json.loads(response["body"].read().decode("utf-8"))
-        return embedding[
-            "embedding"
-        ]
-    except Exception as e:
-        print(f"Error generating embeddings with Titan: {e}")
-        return None
\ No newline at end of file
+def invoke_model(limiter=bedrock_limiter, **kwargs):
+    """bedrock_client.invoke_model, rate-limited by ``limiter`` and retried on throttling."""
+    return call_with_backoff(bedrock_client.invoke_model, limiter, **kwargs)
+
+
+def get_embedding_cache():
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(EMBEDDING_CACHE_DB)
+    return _embedding_cache
+
+
+def _embed_titan(text, model_id, dimensions, limiter=bedrock_limiter):
+    response = invoke_model(
+        limiter=limiter,
+        modelId=model_id,
+        contentType="application/json",
+        accept="application/json",
+        body=json.dumps({"inputText": text, "normalize": True, "dimensions": dimensions}),
+    )
+    return json.loads(response["body"].read().decode("utf-8"))["embedding"]
+
+
+def _embed_cohere(texts, model_id, input_type=SEARCH_DOCUMENT):
+    response = invoke_model(
+        limiter=query_limiter if input_type == SEARCH_QUERY else bedrock_limiter,
+        modelId=model_id,
+        contentType="application/json",
+        accept="*/*",
+        body=json.dumps({"texts": texts, "input_type": input_type, "truncate": "END"}),
+    )
+    return json.loads(response["body"].read().decode("utf-8"))["embeddings"]
+
+
+def cache_key(model_id, dimensions, input_type=SEARCH_DOCUMENT):
+    """``(model_key, dimensions)`` that identify a vector in the embedding caches.
+
+    Titan embeds queries and documents alike; for the other providers the
+    input type is part of the key, and Cohere ignores ``dimensions``.
+    """
+    if input_type != SEARCH_DOCUMENT and not model_id.startswith("amazon.titan"):
+        model_id = f"{model_id}#{input_type}"
+    if model_id.startswith("cohere.embed"):
+        dimensions = 0
+    return model_id, dimensions
+
+
+def _embed_uncached(texts, model_id, dimensions, input_type=SEARCH_DOCUMENT):
+    """Embed ``texts`` in as few calls as the model allows; failed texts map to None."""
+    if is_local_model(model_id):
+        try:
+            return embed_local(texts, model_id, dimensions, query=input_type == SEARCH_QUERY)
+        except Exception as e:
+            logging.error(f"Error generating embeddings with {model_id}: {e}")
+            return [None] * len(texts)
+
+    if model_id.startswith("cohere.embed"):
+        vectors = []
+        for start in range(0, len(texts), COHERE_EMBED_BATCH_SIZE):
+            batch = texts[start : start + COHERE_EMBED_BATCH_SIZE]
+            try:
+                vectors.extend(_embed_cohere(batch, model_id, input_type))
+            except Exception as e:
+                logging.error(f"Error generating embeddings with {model_id}: {e}")
+                vectors.extend([None] * len(batch))
+        return vectors
+
+    # Titan takes one input per request, so the batch is spread over worker threads
+    def embed_one(text):
+        try:
+            limiter = query_limiter if input_type == SEARCH_QUERY else bedrock_limiter
+            return _embed_titan(text, model_id, dimensions, limiter)
+        except Exception as e:
+            logging.error(f"Error generating embeddings with Titan: {e}")
+            return None
+
+    if len(texts) == 1:
+        return [embed_one(texts[0])]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=EMBEDDING_WORKERS) as executor:
+        return list(executor.map(embed_one, texts))
+
+
+def generate_embeddings_batch(
+    texts,
+    model_id=EMBEDDING_MODEL_ID,
+    dimensions=EMBEDDING_DIMENSIONS,
+    use_cache=True,
+    input_type=SEARCH_DOCUMENT,
+):
+    """Return one embedding per input text (None where the provider failed).
+
+    ``model_id`` selects the provider: Bedrock model ids go to Bedrock, and
+    ``local:<model>`` ids are embedded on the CPU by ``utils.local_embeddings``.
+    ``input_type`` is ``SEARCH_DOCUMENT`` for indexed text and ``SEARCH_QUERY``
+    for search queries.
+
+    Duplicate texts are embedded once, and vectors are looked up in and written
+    to the on-disk cache keyed by ``cache_key`` and the text hash, so a text is
+    only ever sent to Bedrock once per model configuration.
+    """
+    hashes = [text_hash(text) for text in texts]
+    unique = dict(zip(hashes, texts))
+    cache = get_embedding_cache() if use_cache else None
+    model_key, key_dimensions = cache_key(model_id, dimensions, input_type)
+    vectors = cache.get_many(model_key, key_dimensions, unique) if cache else {}
+
+    missing = [key for key in unique if key not in vectors]
+    if missing:
+        fresh = _embed_uncached([unique[key] for key in missing], model_id, dimensions, input_type)
+        computed = {key: vector for key, vector in zip(missing, fresh) if vector}
+        if cache and computed:
+            cache.put_many(model_key, key_dimensions, computed)
+        vectors.update(computed)
+    return [vectors.get(key) for key in hashes]
+
+
+def generate_embeddings(text, model_id=EMBEDDING_MODEL_ID, input_type=SEARCH_DOCUMENT):
+    return generate_embeddings_batch([text], model_id=model_id, input_type=input_type)[0]
+
+
+def normalize_query(query):
+    return " ".join(query.lower().split())
+
+
+def get_query_embedding(query, model_id=EMBEDDING_MODEL_ID):
+    """Embedding for a search query, served from cache whenever possible.
+
+    Queries are normalized (case and whitespace) before lookup. The in-process
+    LRU is checked first, then the shared Redis cache when
+    ``QUERY_CACHE_REDIS_URL`` is configured, and only then Bedrock (which
+    itself goes through the on-disk embedding cache).
+    """
+    normalized = normalize_query(query)
+    if not normalized:
+        return None
+    model_key, dimensions = cache_key(model_id, EMBEDDING_DIMENSIONS, SEARCH_QUERY)
+    key = f"{model_key}:{dimensions}:{text_hash(normalized)}"
+    embedding = query_embedding_cache.get(key)
+    if embedding is not None:
+        return embedding
+
+    if shared_query_cache is not None:
+        try:
+            embedding = shared_query_cache.get(key)
+        except Exception as e:
+            logging.warning(f"Shared query-embedding cache read failed: {e}")
+    if embedding is None:
+        embedding = generate_embeddings(normalized, model_id=model_id, input_type=SEARCH_QUERY)
+        if embedding is None:
+            return None
+        if shared_query_cache is not None:
+            try:
+                shared_query_cache.set(key, embedding)
+            except Exception as e:
+                logging.warning(f"Shared query-embedding cache write failed: {e}")
+    query_embedding_cache.set(key, embedding)
+    return embedding
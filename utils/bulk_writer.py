@@ -0,0 +1,121 @@
+import logging
+from contextlib import contextmanager
+import threading
+import time
+from opensearchpy import helpers
+
+
+class BulkWriter:
+    """Thread-safe buffer of bulk actions flushed by count or by age.
+
+    Producers call ``add``; a flush is sent once ``flush_size`` actions are
+    buffered or the oldest buffered action is ``flush_interval`` seconds old.
+    Long-idle buffers are flushed by whoever calls ``flush_if_due`` (typically
+    the consumer loop on a queue timeout). Failed items are logged and handed to
+    ``on_failure`` so callers can compensate; the actions that were written are
+    handed to ``on_success``.
+    """
+
+    def __init__(
+        self, client, flush_size=500, flush_interval=5.0, on_failure=None, on_success=None
+    ):
+        self.client = client
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.on_failure = on_failure
+        self.on_success = on_success
+        self.success = 0
+        self.failed = 0
+        self._actions = []
+        self._first_added = None
+        self._lock = threading.Lock()
+
+    def add(self, *actions):
+        with self._lock:
+            if not self._actions:
+                self._first_added = time.monotonic()
+            self._actions.extend(actions)
+            due = len(self._actions) >= self.flush_size or self._is_stale()
+        if due:
+            self.flush()
+
+    def _is_stale(self):
+        return (
+            self._first_added is not None
+            and time.monotonic() - self._first_added >= self.flush_interval
+        )
+
+    def flush_if_due(self):
+        with self._lock:
+            due = bool(self._actions) and self._is_stale()
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            actions, self._actions = self._actions, []
+            self._first_added = None
+        if not actions:
+            return
+        # streaming_bulk yields one result per action, in order, so results are
+        # matched by position: responses name the concrete index, not the alias
+        # the action was sent to, and ids can repeat across indices.
+        results = []
+        try:
+            for ok, item in helpers.streaming_bulk(
+                self.client,
+                actions,
+                chunk_size=len(actions),
+                raise_on_error=False,
+                raise_on_exception=False,
+            ):
+                results.append((ok, next(iter(item.values()))))
+        except Exception as e:
+            logging.error(f"Bulk flush of {len(actions)} actions failed: {e}", exc_info=True)
+            results += [(False, {**action, "error": str(e)}) for action in actions[len(results):]]
+        succeeded = [action for action, (ok, _) in zip(actions, results) if ok]
+        failed = [item for ok, item in results if not ok]
+        for item in failed:
+            logging.error(
+                f"Bulk item {item.get('_index')}/{item.get('_id')} failed: {item.get('error')}"
+            )
+        with self._lock:
+            self.success += len(succeeded)
+            self.failed += len(failed)
+        logging.info(f"Bulk flush: {len(succeeded)} succeeded, {len(failed)} failed")
+        if failed and self.on_failure:
+            self.on_failure(failed)
+        if succeeded and self.on_success:
+            self.on_success(succeeded)
+
+    def close(self):
+        self.flush()
+        return self.success, self.failed
+
+
+@contextmanager
+def refresh_disabled(client, index_name):
+    """Turn off periodic refresh on ``index_name`` for a backfill, then restore it.
+
+    The previous ``refresh_interval`` (or the cluster default when none was
+    set) is put back and the index refreshed once, even if the backfill fails.
+    A ``-1`` found on entry is left over from a crashed backfill, so it is
+    restored as the default too.
+    """
+    original = None
+    try:
+        settings = client.indices.get_settings(index=index_name, name="index.refresh_interval")
+        for index_settings in settings.values():
+            original = index_settings.get("settings", {}).get("index", {}).get("refresh_interval")
+        if original == "-1":
+            original = None
+    except Exception as e:
+        logging.warning(f"Could not read refresh_interval for {index_name}: {e}")
+    client.indices.put_settings(index=index_name, body={"index": {"refresh_interval": "-1"}})
+    logging.info(f"Disabled refresh on {index_name} (was {original or 'default'})")
+    try:
+        yield
+    finally:
+        client.indices.put_settings(index=index_name, body={"index": {"refresh_interval": original}})
+        client.indices.refresh(index=index_name)
+        logging.info(f"Restored refresh_interval on {index_name} to {original or 'default'}")
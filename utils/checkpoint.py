@@ -0,0 +1,100 @@
+import json
+import sqlite3
+import threading
+import time
+
+CHECKPOINT_DB = "ingest_checkpoints.sqlite3"
+STAGES = ["fetched", "raw_stored", "enriched", "embedded", "vector_stored"]
+STAGE_RANK = {stage: rank for rank, stage in enumerate(STAGES)}
+
+
+class CheckpointJournal:
+    """Durable per-document progress through the ingest and NLP stages.
+
+    Each document (keyed by ``doc_id_for_url``) holds the furthest stage it has
+    reached; recording an earlier stage never moves it backwards. Intermediate
+    results that are expensive to recompute (the enriched document, its
+    embedding) can be stored as a JSON payload so a restart resumes from them;
+    a later stage recorded without a payload keeps the stored one.
+    SQLite in WAL mode keeps every write durable across crashes.
+    """
+
+    def __init__(self, path=CHECKPOINT_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "doc_id TEXT PRIMARY KEY, pr_url TEXT, stage TEXT NOT NULL, "
+            "stage_rank INTEGER NOT NULL, payload TEXT, last_error TEXT, updated_at REAL)"
+        )
+        self.conn.commit()
+
+    def record(self, doc_id, stage, pr_url=None, payload=None):
+        self.record_many([doc_id], stage, pr_url=pr_url, payload=payload)
+
+    def record_many(self, doc_ids, stage, pr_url=None, payload=None):
+        rank = STAGE_RANK[stage]
+        payload_json = json.dumps(payload) if payload is not None else None
+        now = time.time()
+        with self._lock:
+            self.conn.executemany(
+                "INSERT INTO checkpoints (doc_id, pr_url, stage, stage_rank, payload, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(doc_id) DO UPDATE SET "
+                "pr_url = COALESCE(excluded.pr_url, pr_url), stage = excluded.stage, "
+                "stage_rank = excluded.stage_rank, payload = COALESCE(excluded.payload, payload), "
+                "last_error = NULL, updated_at = excluded.updated_at "
+                "WHERE excluded.stage_rank >= checkpoints.stage_rank",
+                [(doc_id, pr_url, stage, rank, payload_json, now) for doc_id in doc_ids],
+            )
+            self.conn.commit()
+
+    def record_failure(self, doc_id, stage, error, pr_url=None):
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO checkpoints (doc_id, pr_url, stage, stage_rank, last_error, updated_at) "
+                "VALUES (?, ?, ?, -1, ?, ?) "
+                "ON CONFLICT(doc_id) DO UPDATE SET last_error = excluded.last_error, "
+                "updated_at = excluded.updated_at",
+                (doc_id, pr_url, f"failed:{stage}", str(error), time.time()),
+            )
+            self.conn.commit()
+
+    def stage_of(self, doc_id):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT stage, stage_rank FROM checkpoints WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+        return row[0] if row and row[1] >= 0 else None
+
+    def reached(self, doc_id, stage):
+        current = self.stage_of(doc_id)
+        return current is not None and STAGE_RANK[current] >= STAGE_RANK[stage]
+
+    def load_payload(self, doc_id):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT payload FROM checkpoints WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def completed(self, stage):
+        """Return the set of doc IDs at or beyond ``stage``."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT doc_id FROM checkpoints WHERE stage_rank >= ?", (STAGE_RANK[stage],)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def failures(self):
+        with self._lock:
+            return self.conn.execute(
+                "SELECT doc_id, pr_url, last_error FROM checkpoints WHERE last_error IS NOT NULL"
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,25 @@
+"""Split long press releases into overlapping passages for chunk-level embeddings."""
+
+CHUNK_WINDOW_WORDS = 200
+CHUNK_OVERLAP_WORDS = 50
+
+
+def chunk_text(text, window=CHUNK_WINDOW_WORDS, overlap=CHUNK_OVERLAP_WORDS):
+    """Return overlapping word windows of ``text``.
+
+    Each passage holds up to ``window`` words and repeats the last ``overlap``
+    words of the one before it, so a sentence cut at a boundary still appears
+    whole in one passage. Short texts come back as a single passage.
+    """
+    if overlap >= window:
+        raise ValueError("overlap must be smaller than window")
+    words = (text or "").split()
+    if not words:
+        return []
+    step = window - overlap
+    passages = []
+    for start in range(0, len(words), step):
+        passages.append(" ".join(words[start : start + window]))
+        if start + window >= len(words):
+            break
+    return passages
@@ -1,15 +1,23 @@
+import os
 from .get_secrets import get_secret
+from .index_aliases import write_alias
 
 BEDROCK_RERANKER_MODEL_ARN = "arn:aws:bedrock:us-west-2::foundation-model/amazon.rerank-v1:0"
 CROSS_ENCODER_MODEL_NAME = 'BAAI/bge-reranker-base'
 BASE_MODEL_ID = "cohere.command-r-v1:0"
-EMBEDDING_MODEL_ID = "amazon.titan-embed-text-v2:0"
+# e.g. "local:Snowflake/snowflake-arctic-embed-m-v1.5" to embed on the CPU instead of Bedrock
+EMBEDDING_MODEL_ID = os.environ.get("EMBEDDING_MODEL_ID", "amazon.titan-embed-text-v2:0")
 PIPELINE_NAME = "hybrid_norm_pipeline"
 REGION = "us-east-1"
 credentials = get_secret()
 PR_META_URL_IDX = credentials.get("PR_META_URL_IDX")
 PR_META_VECTOR_IDX = credentials.get('PR_META_VECTOR_IDX')
 PR_META_RAW_IDX = credentials.get('PR_META_RAW_IDX')
+# Per-chunk vectors of the documents in PR_META_VECTOR_IDX
+PR_META_PASSAGE_IDX = credentials.get("PR_META_PASSAGE_IDX") or f"{PR_META_VECTOR_IDX}_passages"
+# Writers go through these aliases so a reindex can redirect them (see utils/index_aliases.py)
+PR_META_VECTOR_WRITE_IDX = write_alias(PR_META_VECTOR_IDX)
+PR_META_PASSAGE_WRITE_IDX = write_alias(PR_META_PASSAGE_IDX)
 PIPELINE_DEFINITION = {
     "description": "Pipeline for normalizing and combining lexical/semantic scores",
     "phase_results_processors": [
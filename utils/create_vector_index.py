@@ -1,30 +1,30 @@
-from .constants import PR_META_RAW_IDX, PR_META_VECTOR_IDX
+from .constants import PR_META_PASSAGE_IDX, PR_META_RAW_IDX, PR_META_VECTOR_IDX
 from utils.opensearch import get_os_client
+from utils.index_aliases import ensure_aliases
+from utils.index_profiles import embedding_field, get_profile, index_settings
 
 client = get_os_client()
 
 
-def create_vector_index(index_name):
+def create_vector_index(index_name, profile=None):
+    """Create the document vector index with ``profile`` (see ``utils.index_profiles``)."""
+    profile = profile or get_profile()
     index_body = {
-        "settings": {"index.knn": True},  # Enable k-NN search functionality
+        "settings": index_settings(profile),  # Enables k-NN search functionality
         "mappings": {
             "properties": {
-                # Embedding field for semantic search
-                "embedding": {
-                    "type": "knn_vector",
-                    "dimension": 256,  # Set dimension based on Amazon Titan model
-                    "method": {
-                        "name": "hnsw",
-                        "space_type": "cosinesimil",
-                        "engine": "nmslib",
-                    },
-                },
+                # Embedding field for semantic search (dimension of the Amazon Titan model)
+                "embedding": embedding_field(256, profile),
                 # Metadata fields
                 "pr_url": {"type": "keyword"},
                 "pr_title": {"type": "text"},
                 "summary": {"type": "text"},
                 "pr_date": {"type": "date"},
                 "pr_content": {"type": "text"},
+                # Fingerprint of pr_content used to skip unchanged documents
+                "content_hash": {"type": "keyword"},
+                # Fingerprint of the chunking and embedding behind its passages
+                "passage_hash": {"type": "keyword"},
                 # Named entities extracted from content
                 "entities": {
                     "type": "nested",
@@ -47,12 +47,39 @@ def create_vector_index(index_name):
 
     try:
         response = client.indices.create(index=index_name, body=index_body)
-        print(f"Vector index '{index_name}' created successfully!")
+        print(f"Vector index '{index_name}' created successfully with profile {profile['name']}!")
         return response
     except Exception as e:
         print(f"Error creating vector index: {e}")
 
 
+def create_passage_index(index_name, profile=None):
+    """Child index of per-chunk vectors; each passage points at its document by ``parent_id``."""
+    profile = profile or get_profile()
+    index_body = {
+        "settings": index_settings(profile),
+        "mappings": {
+            "properties": {
+                "embedding": embedding_field(256, profile),
+                # _id of the parent document in the vector index
+                "parent_id": {"type": "keyword"},
+                "chunk_index": {"type": "integer"},
+                "text": {"type": "text"},
+                "pr_url": {"type": "keyword"},
+                "pr_title": {"type": "text"},
+                "pr_date": {"type": "date"},
+            }
+        },
+    }
+
+    try:
+        response = client.indices.create(index=index_name, body=index_body)
+        print(f"Passage index '{index_name}' created successfully!")
+        return response
+    except Exception as e:
+        print(f"Error creating passage index: {e}")
+
+
 def create_meta_index(index_name):
     index_body = {"settings": {"index": {"number_of_shards": 2}}}
     try:
@@ -63,18 +90,19 @@ def create_meta_index(index_name):
         print(f"Error creating meta index: {e}")
 
 
-if client.indices.exists(PR_META_RAW_IDX):
-    print("Index exists")
-else:
-    create_meta_index(PR_META_RAW_IDX)
+def ensure_indices():
+    """Create whatever indices and aliases are missing; existing indices are left untouched.
+
+    Mapping or vector-setting changes go through ``utils.reindex`` instead.
+    """
+    if client.indices.exists(PR_META_RAW_IDX):
+        print("Index exists")
+    else:
+        create_meta_index(PR_META_RAW_IDX)
+
+    print(f"Vector index: {ensure_aliases(client, PR_META_VECTOR_IDX, create_vector_index)}")
+    print(f"Passage index: {ensure_aliases(client, PR_META_PASSAGE_IDX, create_passage_index)}")
 
-if client.indices.exists(PR_META_RAW_IDX):
-    print("Index exists")
-else:
-    create_meta_index(PR_META_RAW_IDX)
 
-if client.indices.exists(PR_META_VECTOR_IDX):
-    # client.indices.delete(VECTOR_INDEX_NAME)
-    print("Vector index exists")
-else:
-    create_vector_index(PR_META_VECTOR_IDX)
+if __name__ == "__main__":
+    ensure_indices()
@@ -0,0 +1,41 @@
+import hashlib
+from urllib.parse import urlsplit, urlunsplit
+
+
+def normalize_url(url):
+    """Canonical form of a press-release URL: https, lower-case host, no fragment or trailing slash."""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", parts.netloc.lower(), path, parts.query, ""))
+
+
+def doc_id_for_url(url):
+    """Stable document ID shared by the URL, raw and vector indices.
+
+    Derived only from the normalized ``pr_url``, so any loader can compute it
+    without coordination and re-running a load overwrites instead of duplicating.
+    """
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()[:32]
+
+
+def passage_id(doc_id, chunk_index):
+    """ID of one passage of a document in the passages index."""
+    return f"{doc_id}-{chunk_index}"
+
+
+def parent_id_of(passage_doc_id):
+    return passage_doc_id.rsplit("-", 1)[0]
+
+
+def content_fingerprint(text, *salts):
+    """Fingerprint of a document's content, optionally salted with model IDs.
+
+    Salting with the LLM and embedding model IDs means switching either model
+    changes every fingerprint and forces re-enrichment.
+    """
+    normalized = " ".join((text or "").split())
+    digest = hashlib.sha256()
+    for salt in salts:
+        digest.update(f"{salt}\x00".encode("utf-8"))
+    digest.update(normalized.encode("utf-8"))
+    return digest.hexdigest()
@@ -0,0 +1,121 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+EMBEDDING_CACHE_DB = "embedding_cache.sqlite3"
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """On-disk embedding store keyed by (model_id, dimensions, sha256(text)).
+
+    Vectors are kept as packed float32 blobs in SQLite, so the cache is shared
+    by every process on the host and survives restarts.
+    """
+
+    def __init__(self, path=EMBEDDING_CACHE_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model_id TEXT NOT NULL, dimensions INTEGER NOT NULL, text_hash TEXT NOT NULL, "
+            "vector BLOB NOT NULL, PRIMARY KEY (model_id, dimensions, text_hash))"
+        )
+        self.conn.commit()
+
+    def get_many(self, model_id, dimensions, hashes):
+        """Return ``{text_hash: vector}`` for the hashes that are cached."""
+        found = {}
+        hashes = list(hashes)
+        with self._lock:
+            for start in range(0, len(hashes), 500):
+                batch = hashes[start : start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self.conn.execute(
+                    "SELECT text_hash, vector FROM embeddings WHERE model_id = ? AND dimensions = ? "
+                    f"AND text_hash IN ({placeholders})",
+                    (model_id, dimensions, *batch),
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model_id, dimensions, vectors):
+        """Store ``{text_hash: vector}``."""
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model_id, dimensions, text_hash, vector) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (model_id, dimensions, key, array("f", vector).tobytes())
+                    for key, vector in vectors.items()
+                ],
+            )
+            self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class TTLCache:
+    """Thread-safe in-process LRU whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize=2048, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisVectorCache:
+    """Shared vector cache in Redis, for query embeddings reused across app processes."""
+
+    def __init__(self, url, ttl=3600, prefix="qemb"):
+        if redis is None:
+            raise RuntimeError("redis is required for the shared query-embedding cache")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        blob = self.client.get(f"{self.prefix}:{key}")
+        return array("f", blob).tolist() if blob else None
+
+    def set(self, key, value):
+        self.client.setex(f"{self.prefix}:{key}", self.ttl, array("f", value).tobytes())
@@ -0,0 +1,45 @@
+"""Client-side fusion of ranked result lists from several retrieval legs."""
+
+FUSION_METHODS = ("rrf", "weighted")
+RRF_K = 60
+
+
+def check_fusion_method(method):
+    if method not in FUSION_METHODS:
+        raise ValueError(f"Unknown fusion method {method!r}; use rrf or weighted")
+
+
+def fuse_results(result_lists, method="rrf", weights=None):
+    """Merge ranked result lists from several retrieval legs into one list, best first.
+
+    ``rrf`` scores a document ``sum(w / (RRF_K + rank))`` over the legs that
+    returned it. ``weighted`` min-max normalizes each leg's scores and takes
+    their weighted mean (a leg that missed the document counts 0), like the
+    ``hybrid_norm_pipeline`` search pipeline. Documents are matched on
+    ``pr_url`` and ``score`` holds the fused score, scaled to [0, 1] so score
+    thresholds keep working.
+    """
+    check_fusion_method(method)
+    weights = weights or [1.0] * len(result_lists)
+    fused, documents = {}, {}
+    for results, weight in zip(result_lists, weights):
+        scores = [doc.get("score") or 0.0 for doc in results]
+        low, high = (min(scores), max(scores)) if scores else (0.0, 0.0)
+        for rank, doc in enumerate(results, 1):
+            key = doc.get("pr_url") or id(doc)
+            documents.setdefault(key, doc)
+            if method == "rrf":
+                contribution = weight / (RRF_K + rank)
+            else:
+                score = doc.get("score") or 0.0
+                contribution = weight * ((score - low) / (high - low) if high > low else 1.0)
+            fused[key] = fused.get(key, 0.0) + contribution
+
+    # Scale to [0, 1] like the pipeline's scores: 1 means top of (or, for rrf, first in) every leg
+    total_weight = sum(weights) if method == "weighted" else sum(weights) / (RRF_K + 1)
+    merged = []
+    for key, score in sorted(fused.items(), key=lambda item: item[1], reverse=True):
+        doc = dict(documents[key])
+        doc["score"] = score / total_weight
+        merged.append(doc)
+    return merged
@@ -0,0 +1,101 @@
+"""Versioned physical indices behind a read alias and a write alias.
+
+Each logical index name (``PR_META_VECTOR_IDX``, ``PR_META_PASSAGE_IDX``) is a
+read alias over a physical index ``<name>_v<N>``, and ``<name>_write`` is the
+alias writers use. Search keeps querying the logical name while
+``utils.reindex`` builds the next version, then both aliases are moved in one
+atomic ``_aliases`` call.
+
+An index created before aliases were introduced (a concrete index under the
+logical name) is adopted as is: only the write alias is added, and the first
+reindex replaces it.
+"""
+import logging
+import re
+
+
+def write_alias(alias):
+    return f"{alias}_write"
+
+
+def versioned_name(alias, version):
+    return f"{alias}_v{version}"
+
+
+def belongs_to(index_name, alias):
+    """Whether ``index_name`` from a bulk response or action is ``alias``, its write alias or one of its versions."""
+    if index_name in (alias, write_alias(alias)):
+        return True
+    return re.fullmatch(rf"{re.escape(alias)}_v\d+", index_name or "") is not None
+
+
+def is_legacy_index(client, alias):
+    return client.indices.exists(index=alias) and not client.indices.exists_alias(name=alias)
+
+
+def current_index(client, alias):
+    """Physical index that ``alias`` reads from, or None if there is none yet."""
+    if is_legacy_index(client, alias):
+        return alias
+    if not client.indices.exists_alias(name=alias):
+        return None
+    return next(iter(client.indices.get_alias(name=alias)))
+
+
+def next_version(client, alias):
+    existing = client.indices.get(index=f"{alias}_v*", ignore_unavailable=True, allow_no_indices=True)
+    versions = [int(name.rsplit("_v", 1)[1]) for name in existing if belongs_to(name, alias)]
+    return max(versions, default=0) + 1
+
+
+def ensure_aliases(client, alias, create_index):
+    """Make sure ``alias`` and its write alias exist, creating ``<alias>_v1`` if needed.
+
+    ``create_index(name)`` builds an empty physical index with the right mapping.
+    """
+    if client.indices.exists(index=write_alias(alias)) and not client.indices.exists_alias(
+        name=write_alias(alias)
+    ):
+        raise RuntimeError(
+            f"{write_alias(alias)} is a concrete index (auto-created by a write before the alias "
+            f"existed); move its documents into {alias} and delete it"
+        )
+    index_name = current_index(client, alias)
+    if index_name is None:
+        index_name = versioned_name(alias, 1)
+        create_index(index_name)
+        client.indices.update_aliases(
+            body={
+                "actions": [
+                    {"add": {"index": index_name, "alias": alias}},
+                    {"add": {"index": index_name, "alias": write_alias(alias), "is_write_index": True}},
+                ]
+            }
+        )
+        logging.info(f"Created {index_name} behind aliases {alias} and {write_alias(alias)}")
+    elif not client.indices.exists_alias(name=write_alias(alias)):
+        client.indices.put_alias(index=index_name, name=write_alias(alias))
+        logging.info(f"Added write alias {write_alias(alias)} to {index_name}")
+    return index_name
+
+
+def move_write_alias(client, alias, new_index):
+    actions = [
+        {"add": {"index": new_index, "alias": write_alias(alias), "is_write_index": True}}
+    ]
+    if client.indices.exists_alias(name=write_alias(alias)):
+        for index_name in client.indices.get_alias(name=write_alias(alias)):
+            actions.insert(0, {"remove": {"index": index_name, "alias": write_alias(alias)}})
+    client.indices.update_aliases(body={"actions": actions})
+
+
+def swap_read_alias(client, alias, new_index):
+    """Point ``alias`` at ``new_index`` atomically; a legacy concrete index is deleted in the same call."""
+    old_index = current_index(client, alias)
+    actions = [{"add": {"index": new_index, "alias": alias}}]
+    if old_index == alias:
+        actions.append({"remove_index": {"index": old_index}})
+    elif old_index:
+        actions.insert(0, {"remove": {"index": old_index, "alias": alias}})
+    client.indices.update_aliases(body={"actions": actions})
+    return old_index
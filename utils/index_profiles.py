@@ -0,0 +1,90 @@
+"""Named k-NN index profiles: engine, vector encoding, HNSW parameters and sharding.
+
+``VECTOR_INDEX_PROFILE`` (environment variable, default ``default``) picks the
+profile ``create_vector_index`` builds with. ``default`` reproduces the
+original mapping (nmslib HNSW with the plugin's default parameters). Use
+``benchmarks/tune_knn_index.py`` to measure a profile before switching to it.
+"""
+import os
+
+DEFAULT_PROFILE = {
+    "engine": "nmslib",
+    "encoding": "float",
+    "space_type": "cosinesimil",
+    "m": 16,
+    "ef_construction": 100,
+    "ef_search": 100,
+    "shards": 1,
+    "replicas": 1,
+}
+
+# Embeddings are unit length, so inner product ranks exactly like cosine; faiss
+# only accepts cosinesimil on recent k-NN plugin versions.
+INDEX_PROFILES = {
+    "default": {},
+    # Larger graph and search beam for recall at some latency and memory cost
+    "recall": {
+        "engine": "faiss",
+        "space_type": "innerproduct",
+        "m": 32,
+        "ef_construction": 256,
+        "ef_search": 256,
+    },
+    # Half-size vectors via faiss scalar quantization
+    "fp16": {
+        "engine": "faiss",
+        "encoding": "fp16",
+        "space_type": "innerproduct",
+        "ef_construction": 128,
+    },
+    # Quarter-size int8 vectors
+    "byte": {"engine": "lucene", "encoding": "byte", "ef_construction": 128},
+}
+
+ENCODING_ENGINES = {"float": ("nmslib", "faiss", "lucene"), "fp16": ("faiss",), "byte": ("lucene",)}
+
+
+def get_profile(name=None, **overrides):
+    """Profile ``name`` (or the configured one) merged over the defaults, plus ``overrides``."""
+    name = name or os.environ.get("VECTOR_INDEX_PROFILE", "default")
+    if name not in INDEX_PROFILES:
+        raise ValueError(f"Unknown index profile {name!r}; choose from {list(INDEX_PROFILES)}")
+    profile = {**DEFAULT_PROFILE, **INDEX_PROFILES[name], **overrides, "name": name}
+    if profile["engine"] not in ENCODING_ENGINES[profile["encoding"]]:
+        raise ValueError(
+            f"{profile['encoding']} vectors need engine {ENCODING_ENGINES[profile['encoding']]}, "
+            f"not {profile['engine']}"
+        )
+    return profile
+
+
+def index_settings(profile):
+    settings = {
+        "index.knn": True,
+        "number_of_shards": profile["shards"],
+        "number_of_replicas": profile["replicas"],
+    }
+    # Lucene takes its search beam from the query's k instead of an index setting
+    if profile["engine"] != "lucene":
+        settings["index.knn.algo_param.ef_search"] = profile["ef_search"]
+    return settings
+
+
+def embedding_field(dimension, profile):
+    """knn_vector mapping of the ``embedding`` field for ``profile``."""
+    parameters = {"m": profile["m"], "ef_construction": profile["ef_construction"]}
+    if profile["encoding"] == "fp16":
+        parameters["encoder"] = {"name": "sq", "parameters": {"type": "fp16"}}
+    field = {
+        "type": "knn_vector",
+        "dimension": dimension,
+        "method": {
+            "name": "hnsw",
+            "space_type": profile["space_type"],
+            "engine": profile["engine"],
+            "parameters": parameters,
+        },
+    }
+    if profile["encoding"] == "byte":
+        field["data_type"] = "byte"
+    return field
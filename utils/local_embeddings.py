@@ -0,0 +1,95 @@
+"""CPU-local sentence embeddings, used in place of Bedrock for ``local:`` model ids.
+
+``local:<name-or-path>`` is served by sentence-transformers on the CPU (ONNX
+export preferred; ``LOCAL_EMBEDDING_ONNX_FILE`` picks a CPU-specific one).
+Vectors are truncated to the index dimension and re-normalized, so the model
+must be Matryoshka-trained. Switching providers re-embeds the corpus.
+"""
+import logging
+import os
+import threading
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+LOCAL_MODEL_PREFIX = "local:"
+# Matryoshka-trained, 768 dimensions truncatable to the index's 256
+LOCAL_EMBEDDING_MODEL = "Snowflake/snowflake-arctic-embed-m-v1.5"
+LOCAL_ONNX_FILE = os.environ.get("LOCAL_EMBEDDING_ONNX_FILE", "onnx/model.onnx")
+LOCAL_EMBEDDING_THREADS = int(os.environ.get("LOCAL_EMBEDDING_THREADS", min(4, os.cpu_count() or 1)))
+LOCAL_EMBEDDING_BATCH_SIZE = 64
+# Set to use only models already on disk (or a local path) and never touch the network
+LOCAL_EMBEDDING_OFFLINE = os.environ.get("LOCAL_EMBEDDING_OFFLINE", "") not in ("", "0", "false")
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def is_local_model(model_id):
+    return model_id.startswith(LOCAL_MODEL_PREFIX)
+
+
+def _load_model(name):
+    if SentenceTransformer is None:
+        raise RuntimeError("sentence-transformers is required for local embedding models")
+    common = {"device": "cpu", "local_files_only": LOCAL_EMBEDDING_OFFLINE}
+    try:
+        import onnxruntime
+
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = LOCAL_EMBEDDING_THREADS
+        session_options.inter_op_num_threads = 1
+        model = SentenceTransformer(
+            name,
+            backend="onnx",
+            model_kwargs={
+                "file_name": LOCAL_ONNX_FILE,
+                "provider": "CPUExecutionProvider",
+                "session_options": session_options,
+            },
+            **common,
+        )
+        logging.info(f"Loaded local embedding model {name} ({LOCAL_ONNX_FILE})")
+        return model
+    except Exception as e:
+        logging.warning(f"ONNX export of {name} unavailable ({e}); using PyTorch weights")
+
+    import torch
+
+    torch.set_num_threads(LOCAL_EMBEDDING_THREADS)
+    return SentenceTransformer(name, **common)
+
+
+def get_local_model(model_id):
+    name = model_id[len(LOCAL_MODEL_PREFIX):] or LOCAL_EMBEDDING_MODEL
+    with _models_lock:
+        if name not in _models:
+            _models[name] = _load_model(name)
+        return _models[name]
+
+
+def embed_local(texts, model_id, dimensions, query=False):
+    """Embed ``texts`` in batches; returns unit-length vectors of length ``dimensions``.
+
+    With ``query`` the model's ``query`` prompt is applied when it defines one.
+    """
+    model = get_local_model(model_id)
+    model_dimensions = model.get_sentence_embedding_dimension()
+    if model_dimensions and model_dimensions < dimensions:
+        raise ValueError(
+            f"{model_id} produces {model_dimensions}-dim vectors, fewer than the {dimensions} required"
+        )
+    prompt_name = "query" if query and "query" in (model.prompts or {}) else None
+    vectors = model.encode(
+        texts,
+        prompt_name=prompt_name,
+        batch_size=LOCAL_EMBEDDING_BATCH_SIZE,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )[:, :dimensions]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.maximum(norms, 1e-12)
+    return vectors.tolist()
@@ -0,0 +1,245 @@
+"""In-process BM25F lexical search with fuzzy term expansion over a corpus snapshot.
+
+The index covers the fields the OpenSearch queries match on (``pr_title``,
+``summary``, ``pr_content`` and the nested ``topics.text`` /
+``entities.text``), stored per field as CSR postings: a term's postings are
+``doc_ids[offsets[t]:offsets[t + 1]]`` with matching ``tfs``. It is built
+from ``documents.jsonl`` of a ``utils.snapshot`` snapshot and cached next to
+it as ``lexical_index.npz``.
+
+Scoring is BM25F: per-field term frequencies are length-normalized, weighted
+by the field boosts and summed before BM25 saturation. Fuzzy matching
+follows OpenSearch's ``fuzziness``: each query term is expanded to up to
+``FUZZY_MAX_EXPANSIONS`` vocabulary terms within that many edits (capped at 2,
+as in OpenSearch), found with a SymSpell delete dictionary. An expansion
+scores ``FUZZY_PENALTY ** distance`` of an exact match, and a document scores
+its best variant for every query term.
+"""
+import json
+import logging
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from itertools import combinations
+import numpy as np
+from utils.snapshot import (
+    DOCUMENTS_FILE,
+    SNAPSHOT_DIR,
+    date_mask,
+    document_dates,
+    load_documents,
+    shared_engine,
+)
+
+LEXICAL_INDEX_FILE = "lexical_index.npz"
+# Mirrors the boosts of the OpenSearch queries in search_service
+FIELD_BOOSTS = {
+    "pr_title": 3.0,
+    "summary": 2.0,
+    "pr_content": 1.5,
+    "topics.text": 1.5,
+    "entities.text": 1.5,
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+FUZZY_MAX_DISTANCE = 2
+FUZZY_PREFIX_LENGTH = 7
+FUZZY_MAX_EXPANSIONS = 50
+FUZZY_PENALTY = 0.5
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def field_text(doc, field):
+    if field in ("topics.text", "entities.text"):
+        return " ".join(item.get("text", "") for item in doc.get(field.split(".")[0]) or [])
+    return doc.get(field) or ""
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance of ``a`` and ``b``, or ``limit + 1`` once it is known to exceed ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def deletes(term, distance):
+    """All strings obtained by deleting up to ``distance`` characters from ``term``'s prefix."""
+    prefix = term[:FUZZY_PREFIX_LENGTH]
+    variants = {prefix}
+    for n in range(1, min(distance, len(prefix)) + 1):
+        for positions in combinations(range(len(prefix)), n):
+            variants.add("".join(c for i, c in enumerate(prefix) if i not in positions))
+    return variants
+
+
+class LocalLexicalEngine:
+    def __init__(self, snapshot_dir=SNAPSHOT_DIR):
+        self.documents = load_documents(snapshot_dir)
+        self.dates = document_dates(self.documents)
+        path = os.path.join(snapshot_dir, LEXICAL_INDEX_FILE)
+        documents_path = os.path.join(snapshot_dir, DOCUMENTS_FILE)
+        if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(documents_path):
+            self._load(path)
+        else:
+            self._build()
+            self._save(path)
+        self._fuzzy = None
+        self._fuzzy_lock = threading.Lock()
+        logging.info(f"Lexical index over {len(self.documents)} documents, {len(self.vocabulary)} terms")
+
+    def _build(self):
+        count = len(self.documents)
+        postings = {field: defaultdict(list) for field in FIELD_BOOSTS}
+        self.lengths = {field: np.zeros(count, dtype=np.float32) for field in FIELD_BOOSTS}
+        document_frequency = Counter()
+        for doc_id, doc in enumerate(self.documents):
+            seen = set()
+            for field in FIELD_BOOSTS:
+                tokens = tokenize(field_text(doc, field))
+                self.lengths[field][doc_id] = len(tokens)
+                for term, tf in Counter(tokens).items():
+                    postings[field][term].append((doc_id, tf))
+                    seen.add(term)
+            document_frequency.update(seen)
+
+        self.vocabulary = sorted(document_frequency)
+        self.term_ids = {term: i for i, term in enumerate(self.vocabulary)}
+        self.df = np.array([document_frequency[t] for t in self.vocabulary], dtype=np.int32)
+        self.fields = {}
+        for field, by_term in postings.items():
+            offsets = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+            for term, entries in by_term.items():
+                offsets[self.term_ids[term] + 1] = len(entries)
+            offsets = np.cumsum(offsets)
+            doc_ids = np.empty(offsets[-1], dtype=np.int32)
+            tfs = np.empty(offsets[-1], dtype=np.uint16)
+            for term, entries in by_term.items():
+                start = offsets[self.term_ids[term]]
+                doc_ids[start : start + len(entries)] = [d for d, _ in entries]
+                tfs[start : start + len(entries)] = [min(tf, 65535) for _, tf in entries]
+            self.fields[field] = (offsets, doc_ids, tfs)
+        self._prepare()
+
+    def _save(self, path):
+        arrays = {"df": self.df, "vocabulary": np.array(json.dumps(self.vocabulary))}
+        for i, field in enumerate(FIELD_BOOSTS):
+            offsets, doc_ids, tfs = self.fields[field]
+            arrays.update(
+                {
+                    f"offsets_{i}": offsets,
+                    f"doc_ids_{i}": doc_ids,
+                    f"tfs_{i}": tfs,
+                    f"lengths_{i}": self.lengths[field],
+                }
+            )
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(path + ".tmp", path)
+
+    def _load(self, path):
+        with np.load(path) as data:
+            self.vocabulary = json.loads(str(data["vocabulary"]))
+            self.df = data["df"]
+            self.fields, self.lengths = {}, {}
+            for i, field in enumerate(FIELD_BOOSTS):
+                self.fields[field] = (data[f"offsets_{i}"], data[f"doc_ids_{i}"], data[f"tfs_{i}"])
+                self.lengths[field] = data[f"lengths_{i}"]
+        self.term_ids = {term: i for i, term in enumerate(self.vocabulary)}
+        self._prepare()
+
+    def _prepare(self):
+        count = len(self.documents)
+        # Per-field BM25 length normalization, 1 - b + b * len / avg_len
+        self.norms = {}
+        for field, lengths in self.lengths.items():
+            average = float(lengths.mean()) if count and lengths.any() else 1.0
+            self.norms[field] = (1 - BM25_B) + BM25_B * lengths / average
+        self.idf = np.log(1 + (count - self.df + 0.5) / (self.df + 0.5)).astype(np.float32)
+
+    def _fuzzy_index(self):
+        """SymSpell delete dictionary over the vocabulary, built on first fuzzy query."""
+        with self._fuzzy_lock:
+            if self._fuzzy is None:
+                index = defaultdict(list)
+                for term_id, term in enumerate(self.vocabulary):
+                    if term.isdigit() or len(term) > 40:
+                        continue
+                    for variant in deletes(term, FUZZY_MAX_DISTANCE):
+                        index[variant].append(term_id)
+                self._fuzzy = dict(index)
+            return self._fuzzy
+
+    def expand(self, term, fuzziness=0):
+        """``[(term_id, edit_distance), ...]`` for ``term`` and its fuzzy variants."""
+        exact = self.term_ids.get(term)
+        distance = min(int(fuzziness or 0), FUZZY_MAX_DISTANCE)
+        if not distance or term.isdigit():
+            return [(exact, 0)] if exact is not None else []
+        index = self._fuzzy_index()
+        candidates = {tid for variant in deletes(term, distance) for tid in index.get(variant, ())}
+        matches = []
+        for term_id in candidates:
+            d = edit_distance(term, self.vocabulary[term_id], distance)
+            if d <= distance:
+                matches.append((term_id, d))
+        matches.sort(key=lambda match: (match[1], -self.df[match[0]]))
+        return matches[:FUZZY_MAX_EXPANSIONS]
+
+    def term_scores(self, term_id, boosts):
+        """BM25F score of one term for every document."""
+        weighted_tf = np.zeros(len(self.documents), dtype=np.float32)
+        for field, boost in boosts.items():
+            offsets, doc_ids, tfs = self.fields[field]
+            start, end = offsets[term_id], offsets[term_id + 1]
+            if start == end:
+                continue
+            rows = doc_ids[start:end]
+            weighted_tf[rows] += boost * tfs[start:end] / self.norms[field][rows]
+        return self.idf[term_id] * weighted_tf / (BM25_K1 + weighted_tf)
+
+    def scores(self, query, fuzziness=0, boosts=None):
+        boosts = boosts or FIELD_BOOSTS
+        total = np.zeros(len(self.documents), dtype=np.float32)
+        for term in set(tokenize(query)):
+            best = None
+            for term_id, distance in self.expand(term, fuzziness):
+                variant = self.term_scores(term_id, boosts) * (FUZZY_PENALTY ** distance)
+                best = variant if best is None else np.maximum(best, variant)
+            if best is not None:
+                total += best
+        return total
+
+    def search(self, query, k=10, fuzziness=0, start_date=None, end_date=None, boosts=None):
+        """Result dicts shaped like ``execute_search`` (``_source`` plus ``score``), best first."""
+        scores = self.scores(query, fuzziness, boosts)
+        scores[~date_mask(self.dates, start_date, end_date)] = 0
+        matched = int(np.count_nonzero(scores))
+        if not matched:
+            return []
+        k = min(k, matched)
+        rows = np.argpartition(-scores, k - 1)[:k]
+        rows = rows[np.argsort(-scores[rows])]
+        results = []
+        for row in rows:
+            doc = dict(self.documents[row])
+            doc.pop("_id", None)
+            doc["score"] = float(scores[row])
+            results.append(doc)
+        return results
+
+
+def get_local_lexical_engine(snapshot_dir=SNAPSHOT_DIR):
+    return shared_engine(LocalLexicalEngine, snapshot_dir)
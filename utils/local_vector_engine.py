@@ -0,0 +1,101 @@
+"""In-process semantic retrieval over a corpus snapshot (see ``utils.snapshot``).
+
+Exact search is one BLAS matrix-vector product over the memory-mapped unit
+vectors followed by an ``argpartition`` top-k: about 1-2 ms for 30k 256-dim
+vectors, bound by reading the matrix once per query. With ``use_hnsw`` an
+hnswlib graph (built once and saved next to the snapshot) answers in well
+under a millisecond at the cost of approximate results.
+
+Scores follow OpenSearch's cosinesimil scoring, ``(1 + cos) / 2``, so results
+can be mixed with or compared to ``execute_search`` results.
+"""
+import logging
+import os
+import numpy as np
+from utils.snapshot import (
+    SNAPSHOT_DIR,
+    date_mask,
+    document_dates,
+    load_documents,
+    load_vectors,
+    shared_engine,
+)
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+HNSW_FILE = "hnsw.bin"
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 128
+
+
+class LocalVectorEngine:
+    def __init__(self, snapshot_dir=SNAPSHOT_DIR, use_hnsw=False):
+        self.matrix = load_vectors(snapshot_dir)
+        self.documents = load_documents(snapshot_dir)
+        self.dates = document_dates(self.documents)
+        self.hnsw = self._load_hnsw(snapshot_dir) if use_hnsw else None
+        logging.info(
+            f"Loaded {len(self.documents)} vectors from {snapshot_dir}"
+            f"{' with HNSW' if self.hnsw else ''}"
+        )
+
+    def _load_hnsw(self, snapshot_dir):
+        if hnswlib is None:
+            logging.warning("hnswlib is not installed; using exact search")
+            return None
+        count, dimension = self.matrix.shape
+        index = hnswlib.Index(space="ip", dim=dimension)
+        path = os.path.join(snapshot_dir, HNSW_FILE)
+        if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(self.matrix.filename):
+            index.load_index(path, max_elements=count)
+        else:
+            index.init_index(max_elements=count, ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+            index.add_items(np.asarray(self.matrix), np.arange(count))
+            index.save_index(path)
+        index.set_ef(HNSW_EF_SEARCH)
+        return index
+
+    def top_k(self, query_vector, k=10, start_date=None, end_date=None):
+        """Return ``[(row, cosine), ...]`` for the best ``k`` rows within the date range."""
+        query = np.asarray(query_vector, dtype=np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+        mask = date_mask(self.dates, start_date, end_date)
+        if not mask.any():
+            return []
+        k = min(k, int(mask.sum()))
+
+        if self.hnsw is not None:
+            allowed = None if mask.all() else (lambda row: bool(mask[row]))
+            try:
+                labels, distances = self.hnsw.knn_query(query, k=k, filter=allowed)
+                # hnswlib's inner-product distance is 1 - dot
+                return [(int(row), 1.0 - float(d)) for row, d in zip(labels[0], distances[0])]
+            except RuntimeError:
+                # Raised when a narrow filter leaves fewer than k reachable rows
+                if allowed is None:
+                    raise
+
+        scores = self.matrix @ query
+        if not mask.all():
+            scores = np.where(mask, scores, -np.inf)
+        rows = np.argpartition(-scores, k - 1)[:k]
+        rows = rows[np.argsort(-scores[rows])]
+        return [(int(row), float(scores[row])) for row in rows]
+
+    def search(self, query_vector, k=10, start_date=None, end_date=None):
+        """Result dicts shaped like ``execute_search`` (``_source`` plus ``score``), best first."""
+        results = []
+        for row, cosine in self.top_k(query_vector, k, start_date, end_date):
+            doc = dict(self.documents[row])
+            doc.pop("_id", None)
+            doc["score"] = (1.0 + cosine) / 2.0
+            results.append(doc)
+        return results
+
+
+def get_local_vector_engine(snapshot_dir=SNAPSHOT_DIR, use_hnsw=False):
+    return shared_engine(LocalVectorEngine, snapshot_dir, use_hnsw)
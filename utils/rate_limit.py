@@ -0,0 +1,91 @@
+import logging
+import random
+import threading
+import time
+
+THROTTLING_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+}
+
+
+def is_throttling_error(error):
+    code = (getattr(error, "response", None) or {}).get("Error", {}).get("Code")
+    return code in THROTTLING_ERROR_CODES
+
+
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class AdaptiveRateLimiter:
+    """Token bucket whose refill rate adapts to throttling.
+
+    ``acquire`` blocks until a token is available. Each success nudges the rate
+    up by ``increase`` requests/second; each throttle multiplies it by
+    ``decrease`` and drains the bucket (additive-increase, multiplicative-
+    decrease), so concurrent workers settle just under the service's limit.
+    """
+
+    def __init__(self, rate=5.0, burst=None, min_rate=0.2, max_rate=50.0, increase=0.05, decrease=0.5):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._tokens = 0
+        logging.warning(f"Throttled; rate limit lowered to {self.rate:.2f} req/s")
+
+
+def call_with_backoff(fn, limiter=None, max_attempts=6, base_delay=1.0, max_delay=60.0, **kwargs):
+    """Call ``fn(**kwargs)`` under ``limiter``, retrying throttling errors with jittered backoff.
+
+    Non-throttling errors, and the last throttling error, are re-raised.
+    """
+    for attempt in range(max_attempts):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            result = fn(**kwargs)
+        except Exception as e:
+            if not is_throttling_error(e) or attempt == max_attempts - 1:
+                raise
+            if limiter is not None:
+                limiter.on_throttle()
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            logging.warning(f"Throttled (attempt {attempt + 1}/{max_attempts}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        if limiter is not None:
+            limiter.on_success()
+        return result
@@ -0,0 +1,202 @@
+"""Rebuild a vector or passage index under a new version and swap its aliases.
+
+``python -m utils.reindex vector --profile byte`` (or ``passages``) creates
+``<alias>_v<N+1>``, points the write alias at it, copies every document with
+``op_type=create`` and swaps the read alias once the copy is done. Writers and
+queries follow the encoding of the index their alias points to. A failed copy
+moves the write alias back and leaves the new index for inspection; the old
+index is kept for rollback unless ``--delete-old`` is given.
+"""
+import argparse
+import logging
+from opensearchpy import helpers
+from utils.constants import PR_META_PASSAGE_IDX, PR_META_RAW_IDX, PR_META_URL_IDX, PR_META_VECTOR_IDX
+from utils.create_vector_index import client, create_passage_index, create_vector_index
+from utils.doc_ids import doc_id_for_url
+from utils.index_aliases import (
+    current_index,
+    move_write_alias,
+    next_version,
+    swap_read_alias,
+    versioned_name,
+)
+from utils.index_profiles import INDEX_PROFILES, get_profile
+from utils.vector_encoding import as_index_vector
+
+REINDEX_BATCH_SIZE = 500
+TARGETS = {
+    "vector": (PR_META_VECTOR_IDX, create_vector_index),
+    "passages": (PR_META_PASSAGE_IDX, create_passage_index),
+}
+
+
+def reencoded_actions(source_index, target_index, encoding):
+    for hit in helpers.scan(client, index=source_index, query={"query": {"match_all": {}}}):
+        document = hit["_source"]
+        if document.get("embedding") is not None:
+            document["embedding"] = as_index_vector(document["embedding"], encoding)
+        yield {"_op_type": "create", "_index": target_index, "_id": hit["_id"], "_source": document}
+
+
+def copy_documents(source_index, target_index, encoding):
+    """Bulk-copy ``source_index`` into ``target_index``; documents already there are kept.
+
+    Returns ``({doc_id: seq_no}, kept, failed)`` for the documents the copy created.
+    """
+    copied, kept, failed = {}, 0, 0
+    for ok, item in helpers.streaming_bulk(
+        client,
+        reencoded_actions(source_index, target_index, encoding),
+        chunk_size=REINDEX_BATCH_SIZE,
+        raise_on_error=False,
+    ):
+        result = item.get("create", {})
+        if ok:
+            copied[result.get("_id")] = result.get("_seq_no")
+        elif result.get("status") == 409:
+            kept += 1
+        else:
+            failed += 1
+            logging.error(f"Failed to copy {result.get('_id')}: {result.get('error')}")
+    return copied, kept, failed
+
+
+def copy_back_writes(target_index, source_index, copied):
+    """Copy documents written to ``target_index`` by anything but the copy into ``source_index``.
+
+    A document counts as written by the copy when its id and ``_seq_no`` still
+    match what ``copy_documents`` created. Writers encode vectors the same way
+    whichever index the write alias points at, so documents are copied as is.
+    """
+    client.indices.refresh(index=target_index)
+    actions = (
+        {"_op_type": "index", "_index": source_index, "_id": hit["_id"], "_source": hit["_source"]}
+        for hit in helpers.scan(
+            client,
+            index=target_index,
+            query={"query": {"match_all": {}}},
+            seq_no_primary_term=True,
+        )
+        if copied.get(hit["_id"]) != hit.get("_seq_no")
+    )
+    restored, failed = 0, 0
+    for ok, item in helpers.streaming_bulk(
+        client, actions, chunk_size=REINDEX_BATCH_SIZE, raise_on_error=False
+    ):
+        if ok:
+            restored += 1
+        else:
+            failed += 1
+            result = item.get("index", {})
+            logging.error(f"Failed to copy back {result.get('_id')}: {result.get('error')}")
+    return restored, failed
+
+
+def restore_settings(index_name, profile):
+    client.indices.put_settings(
+        index=index_name,
+        body={"index": {"number_of_replicas": profile["replicas"], "refresh_interval": None}},
+    )
+
+
+def reindex(alias, create_index, profile=None, delete_old=False):
+    """Build the next version of ``alias`` with ``profile`` and swap the aliases to it."""
+    profile = profile or get_profile()
+    source_index = current_index(client, alias)
+    target_index = versioned_name(alias, next_version(client, alias))
+    logging.info(f"Reindexing {alias}: {source_index} -> {target_index} ({profile['name']})")
+
+    create_index(target_index, profile)
+    if not client.indices.exists(index=target_index):
+        raise RuntimeError(f"Could not create {target_index}")
+    client.indices.put_settings(
+        index=target_index,
+        body={"index": {"number_of_replicas": 0, "refresh_interval": "-1"}},
+    )
+    move_write_alias(client, alias, target_index)
+
+    if source_index:
+        copied, kept, failed = copy_documents(source_index, target_index, profile["encoding"])
+        logging.info(f"Copied {len(copied)} documents, kept {kept} newer ones, {failed} failed")
+        if failed:
+            move_write_alias(client, alias, source_index)
+            restored, lost = copy_back_writes(target_index, source_index, copied)
+            restore_settings(target_index, profile)
+            logging.error(
+                f"Reindex of {alias} aborted: copied {restored} documents written meanwhile back to "
+                f"{source_index} ({lost} failed). {target_index} is no longer used by any alias; "
+                f"delete it once checked"
+            )
+            raise RuntimeError(
+                f"{failed} documents failed to copy; {alias} still reads {source_index}"
+            )
+
+    restore_settings(target_index, profile)
+    client.indices.refresh(index=target_index)
+    client.cluster.health(index=target_index, wait_for_status="yellow", timeout="10m")
+    old_index = swap_read_alias(client, alias, target_index)
+    logging.info(f"{alias} now reads {target_index}")
+
+    if delete_old and old_index and old_index != alias:
+        client.indices.delete(index=old_index)
+        logging.info(f"Deleted {old_index}")
+    return target_index
+
+
+def remap_legacy_ids(index_name):
+    """Move documents stored under pre-hash ids (integers, auto ids) to ``doc_id_for_url(pr_url)``.
+
+    Each move creates the document under its new id in the same physical
+    index and then deletes the old one. A document that already exists under
+    the new id wins, so the legacy copy is only deleted.
+    """
+    moves = []
+
+    def create_actions():
+        for hit in helpers.scan(client, index=index_name, query={"query": {"match_all": {}}}):
+            pr_url = hit["_source"].get("pr_url")
+            if not pr_url or hit["_id"] == doc_id_for_url(pr_url):
+                continue
+            source = hit["_source"]
+            if "doc_id" in source:
+                source["doc_id"] = doc_id_for_url(pr_url)
+            moves.append((hit["_index"], hit["_id"]))
+            yield {"_op_type": "create", "_index": hit["_index"], "_id": doc_id_for_url(pr_url), "_source": source}
+
+    legacy, failed = [], 0
+    results = helpers.streaming_bulk(
+        client, create_actions(), chunk_size=REINDEX_BATCH_SIZE, raise_on_error=False
+    )
+    for position, (ok, item) in enumerate(results):
+        result = item.get("create", {})
+        if ok or result.get("status") == 409:
+            legacy.append(moves[position])
+        else:
+            failed += 1
+            logging.error(f"Failed to move {moves[position][1]}: {result.get('error')}")
+    deleted, errors = helpers.bulk(
+        client,
+        ({"_op_type": "delete", "_index": index, "_id": doc_id} for index, doc_id in legacy),
+        raise_on_error=False,
+    )
+    logging.info(
+        f"{index_name}: moved {len(legacy)} documents to URL-hash ids ({deleted} legacy copies "
+        f"deleted, {failed + len(errors)} failed)"
+    )
+    return len(legacy), failed + len(errors)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild an index version and swap its aliases.")
+    parser.add_argument("target", choices=[*TARGETS, "remap-ids"])
+    parser.add_argument("--profile", default=None, choices=list(INDEX_PROFILES))
+    parser.add_argument("--delete-old", action="store_true")
+    args = parser.parse_args()
+
+    if args.target == "remap-ids":
+        # One-off migration of indices written before ids were derived from pr_url
+        for index_name in (PR_META_URL_IDX, PR_META_RAW_IDX, PR_META_VECTOR_IDX):
+            remap_legacy_ids(index_name)
+        raise SystemExit(0)
+    alias, create_index = TARGETS[args.target]
+    reindex(alias, create_index, get_profile(args.profile), args.delete_old)
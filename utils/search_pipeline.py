@@ -1,3 +1,4 @@
+import concurrent.futures
 import json
 import logging
 import os
@@ -6,7 +7,10 @@ import time
 from opensearchpy.exceptions import RequestError
 from .constants import BASE_MODEL_ID, CROSS_ENCODER_MODEL_NAME
 from .bedrock import *
+from .doc_ids import doc_id_for_url
+from .fusion import FUSION_METHODS, RRF_K, check_fusion_method, fuse_results
 from .opensearch import get_os_client
+from .vector_encoding import as_index_vector, live_encoding
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -14,6 +18,17 @@ logging.basicConfig(
 
     
 client = get_os_client()
+# Passage hits fetched per requested document, so several chunks of one document still leave room for others
+PASSAGE_CANDIDATE_FACTOR = 5
+PASSAGES_PER_DOC = 3
+# Client-side hybrid fusion ("rrf" or "weighted"); unset keeps the server-side hybrid query
+HYBRID_FUSION = os.environ.get("HYBRID_FUSION", "").strip().lower() or None
+if HYBRID_FUSION not in (None, *FUSION_METHODS):
+    raise ValueError(
+        f"HYBRID_FUSION={os.environ['HYBRID_FUSION']!r} is not a fusion method; "
+        f"use one of {', '.join(FUSION_METHODS)} or leave it unset"
+    )
+hybrid_executor = concurrent.futures.ThreadPoolExecutor(max_workers=8)
 
 
 def expand_query_with_llm(query: str):
@@ -193,4 +208,135 @@ def execute_search(query_body):
         return []
     except Exception as e:
         logging.error(f"Unexpected error during search: {e}", exc_info=True)
-        return []
\ No newline at end of file
+        return []
+
+
+def aggregate_passage_hits(hits, passages_per_doc=PASSAGES_PER_DOC):
+    """Group passage hits by parent document, best first.
+
+    A document scores as its best passage and keeps its ``passages_per_doc``
+    highest-scoring passages.
+    """
+    grouped = {}
+    for hit in hits:
+        source = hit.get("_source") or {}
+        parent_id = source.get("parent_id")
+        if not parent_id:
+            continue
+        score = hit.get("_score", 0.0)
+        entry = grouped.setdefault(parent_id, {"score": score, "passages": []})
+        entry["score"] = max(entry["score"], score)
+        if len(entry["passages"]) < passages_per_doc:
+            entry["passages"].append(
+                {"text": source.get("text"), "chunk_index": source.get("chunk_index"), "score": score}
+            )
+    return dict(sorted(grouped.items(), key=lambda item: item[1]["score"], reverse=True))
+
+
+def query_vector(embedding, index_name=PR_META_VECTOR_IDX):
+    """``embedding`` encoded for a k-NN query against ``index_name``."""
+    return as_index_vector(embedding, live_encoding(client, index_name))
+
+
+def execute_passage_search(query_embedding, k, filters=None, passages_per_doc=PASSAGES_PER_DOC):
+    """k-NN over the passage index, aggregated into the top ``k`` parent documents.
+
+    Results have the same shape as ``execute_search`` plus a ``passages`` list
+    holding the matching chunks of each document.
+    """
+    candidates = k * PASSAGE_CANDIDATE_FACTOR
+    query_body = {
+        "query": {
+            "bool": {
+                "must": [{"knn": {"embedding": {"vector": query_vector(query_embedding, PR_META_PASSAGE_IDX), "k": candidates}}}],
+                "filter": filters or [],
+            }
+        },
+        "size": candidates,
+        "_source": {"excludes": ["embedding"]},
+    }
+    try:
+        response = client.search(index=PR_META_PASSAGE_IDX, body=query_body)
+        grouped = aggregate_passage_hits(response["hits"]["hits"], passages_per_doc)
+        top = dict(list(grouped.items())[:k])
+        if not top:
+            logging.info("No passage hits found.")
+            return []
+        parents = client.mget(
+            index=PR_META_VECTOR_IDX, body={"ids": list(top)}, _source_excludes=["embedding"]
+        )
+    except Exception as e:
+        logging.error(f"Unexpected error during passage search: {e}", exc_info=True)
+        return []
+
+    results = []
+    for doc in parents.get("docs", []):
+        if not doc.get("found"):
+            logging.warning(f"Passages reference missing document {doc.get('_id')}.")
+            continue
+        result = doc["_source"]
+        result["score"] = top[doc["_id"]]["score"]
+        result["passages"] = top[doc["_id"]]["passages"]
+        results.append(result)
+    logging.info(f"Found {len(results)} documents from passage hits.")
+    return normalize_scores_to_100(results)
+
+
+def attach_best_passages(results, query_embedding, passages_per_doc=PASSAGES_PER_DOC):
+    """Add the passages of each result that are closest to the query as ``passages``.
+
+    Scores the passages of just these documents exactly (script_score), which
+    is cheap for a handful of results and never misses a passage to the ANN
+    cut-off. Results are updated in place and returned.
+    """
+    by_id = {doc_id_for_url(doc["pr_url"]): doc for doc in results or [] if doc.get("pr_url")}
+    if not by_id:
+        return results
+    query_body = {
+        "query": {
+            "script_score": {
+                "query": {"terms": {"parent_id": list(by_id)}},
+                "script": {
+                    "source": "knn_score",
+                    "lang": "knn",
+                    "params": {
+                        "field": "embedding",
+                        "query_value": query_vector(query_embedding, PR_META_PASSAGE_IDX),
+                        "space_type": "cosinesimil",
+                    },
+                },
+            }
+        },
+        "size": len(by_id) * passages_per_doc * PASSAGE_CANDIDATE_FACTOR,
+        "_source": {"excludes": ["embedding"]},
+    }
+    try:
+        response = client.search(index=PR_META_PASSAGE_IDX, body=query_body)
+    except Exception as e:
+        logging.error(f"Error fetching passages for results: {e}", exc_info=True)
+        return results
+    for parent_id, entry in aggregate_passage_hits(response["hits"]["hits"], passages_per_doc).items():
+        by_id[parent_id]["passages"] = entry["passages"]
+    return results
+
+
+def run_legs(*legs):
+    """Run zero-argument search callables concurrently; returns their results in order."""
+    futures = [hybrid_executor.submit(leg) for leg in legs]
+    return [future.result() for future in futures]
+
+
+def execute_hybrid_search(lexical_query, semantic_query, size, method="rrf", weights=None):
+    """Hybrid search without the search-pipeline plugin.
+
+    The lexical and k-NN sub-queries go to OpenSearch as two concurrent
+    searches, so latency is that of the slower leg, and are fused client-side
+    with ``fuse_results``. Returns ``execute_search``-shaped results.
+    """
+    check_fusion_method(method)
+    lexical, semantic = run_legs(
+        lambda: execute_search({"query": lexical_query, "size": size, "_source": True}),
+        lambda: execute_search({"query": semantic_query, "size": size, "_source": True}),
+    )
+    logging.info(f"Fusing {len(lexical)} lexical and {len(semantic)} semantic results ({method}).")
+    return normalize_scores_to_100(fuse_results([lexical, semantic], method, weights)[:size])
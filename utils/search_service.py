@@ -5,7 +5,9 @@ from datetime import date
 from .constants import *
 from .opensearch import get_os_client
 from .search_pipeline import *
-from .bedrock import generate_embeddings
+from .bedrock import generate_embeddings, get_query_embedding
+from .local_lexical_engine import get_local_lexical_engine
+from .local_vector_engine import get_local_vector_engine
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -96,7 +98,7 @@ def advanced_search(
     start_date: str = None,
     end_date: str = None,
     ):
-    query_embedding = generate_embeddings(query)
+    query_embedding = get_query_embedding(query)
     if not query_embedding:
         logging.error(
             "Failed to generate query embedding. Cannot perform semantic search."
@@ -114,7 +116,7 @@ def advanced_search(
                             "fuzziness": fuzziness,
                         }
                     },
-                    {"knn": {"embedding": {"vector": query_embedding, "k": k * 3}}},
+                    {"knn": {"embedding": {"vector": query_vector(query_embedding), "k": k * 3}}},
                 ],
                 "filter": build_date_filter(start_date, end_date),
             }
@@ -124,18 +126,97 @@ def advanced_search(
     return execute_search(query_body)
 
 
+def passage_search(
+    query: str,
+    k: int = 10,
+    start_date: str = None,
+    end_date: str = None,
+):
+    """Semantic search over chunk vectors; each document scores as its best passage."""
+    query_embedding = get_query_embedding(query)
+    if not query_embedding:
+        logging.error(
+            "Failed to generate query embedding. Cannot perform passage search."
+        )
+        return []
+    return execute_passage_search(
+        query_embedding, k, filters=build_date_filter(start_date, end_date)
+    )
+
+
+def local_semantic_search(
+    query: str,
+    k: int = 10,
+    start_date: str = None,
+    end_date: str = None,
+    use_hnsw: bool = False,
+):
+    """Semantic search against the in-process snapshot engine instead of OpenSearch k-NN."""
+    query_embedding = get_query_embedding(query)
+    if not query_embedding:
+        logging.error(
+            "Failed to generate query embedding. Cannot perform local semantic search."
+        )
+        return []
+    engine = get_local_vector_engine(use_hnsw=use_hnsw)
+    return normalize_scores_to_100(engine.search(query_embedding, k, start_date, end_date))
+
+
+def local_lexical_search(
+    query: str,
+    k: int = 10,
+    fuzziness: int = 2,
+    start_date: str = None,
+    end_date: str = None,
+):
+    """BM25F lexical and fuzzy search against the in-process snapshot engine."""
+    if not query:
+        logging.warning("Search query is empty.")
+        return []
+    engine = get_local_lexical_engine()
+    return normalize_scores_to_100(
+        engine.search(query, k, fuzziness, start_date, end_date)
+    )
+
+
+def local_hybrid_search(
+    query: str,
+    k: int = 10,
+    fuzziness: int = 2,
+    start_date: str = None,
+    end_date: str = None,
+    fusion: str = "rrf",
+    use_hnsw: bool = False,
+):
+    """Hybrid search entirely in-process: local BM25F and vector legs run concurrently, then fused."""
+    if not query:
+        logging.warning("Search query is empty.")
+        return []
+    check_fusion_method(fusion)
+    candidates = max(k * 5, 50)
+    lexical, semantic = run_legs(
+        lambda: get_local_lexical_engine().search(
+            query, candidates, fuzziness, start_date, end_date
+        ),
+        lambda: local_semantic_search(query, candidates, start_date, end_date, use_hnsw),
+    )
+    return normalize_scores_to_100(fuse_results([lexical, semantic], fusion)[:k])
+
+
 def pro_search(
     query: str,
     k: int = 10,
     fuzziness: int = 2,
     start_date: str = None,
     end_date: str = None,
+    fusion: str = HYBRID_FUSION,
 ):
+    """Hybrid search; ``fusion`` ("rrf"/"weighted") fuses the two legs client-side instead of the server-side hybrid query."""
     if not query:
         logging.warning("Search query is empty.")
         return []
 
-    query_embedding = generate_embeddings(query)
+    query_embedding = get_query_embedding(query)
     if not query_embedding:
         logging.error(
             "Failed to generate query embedding. Cannot perform hybrid search."
@@ -153,7 +234,7 @@ def pro_search(
         }
     semantic_k = max(k * 5, 50)
     semantic_sub_query = {
-        "knn": {"embedding": {"vector": query_embedding, "k": semantic_k}}
+        "knn": {"embedding": {"vector": query_vector(query_embedding), "k": semantic_k}}
     }
     lexical_sub_query = {
         "bool": {
@@ -217,6 +298,9 @@ def pro_search(
         }
     }
 
+    if fusion:
+        return execute_hybrid_search(lexical_sub_query, semantic_sub_query, k, fusion)
+
     hybrid_query_body = {
         "query": {"hybrid": {"queries": [lexical_sub_query, semantic_sub_query]}},
         "size": k,
@@ -234,7 +318,8 @@ def pro_search_enhanced(
     use_topic_expansion: bool = False,
     use_llm_expansion: bool = True,
     use_reranker: bool = True,
-    rerank_window_factor: int = 5
+    rerank_window_factor: int = 5,
+    fusion: str = HYBRID_FUSION,
     ):
     if not query:
         logging.warning("Search query is empty.")
@@ -248,7 +333,7 @@ def pro_search_enhanced(
         search_terms = list(set(search_terms))
 
     logging.info(f"Using search terms after expansion: {search_terms}")
-    original_query_embedding = generate_embeddings(query)
+    original_query_embedding = get_query_embedding(query)
     if not original_query_embedding:
         logging.error("Failed to generate query embedding. Cannot perform hybrid search.")
         return []
@@ -257,7 +342,7 @@ def pro_search_enhanced(
     semantic_k = max(initial_retrieve_k, 50)
 
     semantic_sub_query = {
-        "knn": {"embedding": {"vector": original_query_embedding, "k": semantic_k}}
+        "knn": {"embedding": {"vector": query_vector(original_query_embedding), "k": semantic_k}}
     }
     lexical_should_clauses = []
     for i, term in enumerate(search_terms):
@@ -285,7 +370,12 @@ def pro_search_enhanced(
     }
 
     logging.info(f"Executing initial retrieval for query: '{query}' (expanded terms used)")
-    initial_results = execute_search(hybrid_query_body)
+    if fusion:
+        initial_results = execute_hybrid_search(
+            lexical_sub_query, semantic_sub_query, initial_retrieve_k, fusion
+        )
+    else:
+        initial_results = execute_search(hybrid_query_body)
 
     if not initial_results:
         return []
@@ -304,8 +394,11 @@ def search_kb(
     end_date: str = None,
     use_llm_expansion: bool = True,
     use_reranker: bool = True,
-    rerank_window_factor: int = 5
+    rerank_window_factor: int = 5,
+    use_passages: bool = True,
+    fusion: str = HYBRID_FUSION,
 ):
+    """Knowledge-base retrieval for RAG; with ``use_passages`` each result carries its best ``passages``."""
     if not query:
         logging.warning("Search query is empty.")
         return []
@@ -321,7 +414,7 @@ def search_kb(
 
     logging.info(f"Using search terms after expansion: {search_terms}")
     
-    original_query_embedding = generate_embeddings(query)
+    original_query_embedding = get_query_embedding(query)
     if not original_query_embedding:
         logging.error("Failed to generate query embedding. Cannot perform hybrid search.")
         return []
@@ -330,7 +423,7 @@ def search_kb(
     semantic_k = min(max(1, initial_retrieve_k), 10) 
 
     semantic_sub_query = {
-        "knn": {"embedding": {"vector": original_query_embedding, "k": semantic_k}}
+        "knn": {"embedding": {"vector": query_vector(original_query_embedding), "k": semantic_k}}
     }
     
     lexical_should_clauses = []
@@ -357,7 +450,12 @@ def search_kb(
     }
 
     logging.info(f"Executing initial retrieval for query: '{query}'")
-    pre_filtered_results = execute_search(hybrid_query_body)
+    if fusion:
+        pre_filtered_results = execute_hybrid_search(
+            lexical_sub_query, semantic_sub_query, initial_retrieve_k, fusion
+        )
+    else:
+        pre_filtered_results = execute_search(hybrid_query_body)
 
     if not pre_filtered_results:
         logging.info("No initial results from OpenSearch.")
@@ -387,4 +485,6 @@ def search_kb(
             # Sort by normalized_score and take top k from those meeting the threshold
             confidently_normalized_results.sort(key=lambda x: x.get('normalized_score_100', 0.0), reverse=True)
             final_results_meeting_threshold = confidently_normalized_results[:k]            
+    if use_passages and final_results_meeting_threshold:
+        attach_best_passages(final_results_meeting_threshold, original_query_embedding)
     return final_results_meeting_threshold
\ No newline at end of file
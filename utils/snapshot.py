@@ -0,0 +1,121 @@
+"""On-disk snapshot of the vector index for the in-process search engines.
+
+``python -m utils.snapshot --dir corpus_snapshot`` writes:
+
+* ``vectors.f32``: row-major float32 matrix of unit-length embeddings, opened
+  later with ``numpy.memmap`` so only the pages touched are read;
+* ``documents.jsonl``: one ``_source`` per line (without the embedding), row
+  ``i`` describing vector ``i``;
+* ``meta.json``: row count, dimension and when the snapshot was taken.
+
+Loading needs neither OpenSearch nor AWS credentials, so local search keeps
+working offline; only ``export_snapshot`` talks to the cluster.
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+import numpy as np
+
+SNAPSHOT_DIR = os.environ.get("LOCAL_SNAPSHOT_DIR", "corpus_snapshot")
+VECTORS_FILE = "vectors.f32"
+DOCUMENTS_FILE = "documents.jsonl"
+META_FILE = "meta.json"
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def export_snapshot(snapshot_dir=SNAPSHOT_DIR, index_name=None):
+    """Dump every document of ``index_name`` (default: the vector index) into ``snapshot_dir``."""
+    from opensearchpy import helpers
+    from utils.constants import PR_META_VECTOR_IDX
+    from utils.opensearch import get_os_client
+
+    index_name = index_name or PR_META_VECTOR_IDX
+    os.makedirs(snapshot_dir, exist_ok=True)
+    vectors_tmp = os.path.join(snapshot_dir, VECTORS_FILE + ".tmp")
+    documents_tmp = os.path.join(snapshot_dir, DOCUMENTS_FILE + ".tmp")
+    count, dimension = 0, None
+    with open(vectors_tmp, "wb") as vectors_out, open(documents_tmp, "w", encoding="utf-8") as docs_out:
+        for hit in helpers.scan(get_os_client(), index=index_name, query={"query": {"match_all": {}}}):
+            source = hit["_source"]
+            embedding = source.pop("embedding", None)
+            if not embedding:
+                continue
+            vector = np.asarray(embedding, dtype=np.float32)
+            dimension = dimension or vector.shape[0]
+            vector /= max(float(np.linalg.norm(vector)), 1e-12)
+            vectors_out.write(vector.tobytes())
+            docs_out.write(json.dumps({"_id": hit["_id"], **source}) + "\n")
+            count += 1
+    if not count:
+        os.remove(vectors_tmp)
+        os.remove(documents_tmp)
+        raise RuntimeError(f"{index_name} has no documents with embeddings; snapshot not written")
+    meta_tmp = os.path.join(snapshot_dir, META_FILE + ".tmp")
+    with open(meta_tmp, "w") as f:
+        json.dump(
+            {"count": count, "dimension": dimension, "index": index_name, "created": time.time()}, f
+        )
+    os.replace(vectors_tmp, os.path.join(snapshot_dir, VECTORS_FILE))
+    os.replace(documents_tmp, os.path.join(snapshot_dir, DOCUMENTS_FILE))
+    os.replace(meta_tmp, os.path.join(snapshot_dir, META_FILE))
+    logging.info(f"Snapshot of {count} documents from {index_name} written to {snapshot_dir}")
+    return count
+
+
+def load_meta(snapshot_dir=SNAPSHOT_DIR):
+    with open(os.path.join(snapshot_dir, META_FILE)) as f:
+        return json.load(f)
+
+
+def load_vectors(snapshot_dir=SNAPSHOT_DIR):
+    meta = load_meta(snapshot_dir)
+    return np.memmap(
+        os.path.join(snapshot_dir, VECTORS_FILE),
+        dtype=np.float32,
+        mode="r",
+        shape=(meta["count"], meta["dimension"]),
+    )
+
+
+def load_documents(snapshot_dir=SNAPSHOT_DIR):
+    with open(os.path.join(snapshot_dir, DOCUMENTS_FILE), encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def date_mask(dates, start_date=None, end_date=None):
+    """Boolean mask over ``dates`` (ISO strings) matching ``build_date_filter`` semantics."""
+    mask = np.ones(len(dates), dtype=bool)
+    if not start_date and not end_date:
+        return mask
+    mask &= dates != ""
+    if start_date:
+        mask &= dates >= start_date[:10]
+    if end_date:
+        mask &= dates <= end_date[:10]
+    return mask
+
+
+def document_dates(documents):
+    return np.array([str(doc.get("pr_date") or "")[:10] for doc in documents])
+
+
+def shared_engine(engine_class, *args):
+    """Process-wide ``engine_class(*args)``, loaded on first use and reused after."""
+    key = (engine_class, args)
+    with _engines_lock:
+        if key not in _engines:
+            _engines[key] = engine_class(*args)
+        return _engines[key]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Snapshot the vector index for local search.")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR)
+    parser.add_argument("--index", default=None)
+    args = parser.parse_args()
+    export_snapshot(args.dir, args.index)
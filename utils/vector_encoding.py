@@ -0,0 +1,71 @@
+"""How embeddings are stored in the k-NN indices: float32, fp16 or int8 bytes.
+
+Writers and queries use the encoding of the index an alias currently points
+to (``live_encoding``), read from its mapping and re-checked every
+``ENCODING_TTL_SECONDS``, so a reindex to another profile needs no redeploy.
+``VECTOR_ENCODING`` (environment variable, default: the active index profile's)
+is only the fallback when the mapping cannot be read.
+``fp16`` is quantized server-side by faiss and needs no client change.
+``byte`` stores Lucene byte vectors, so vectors are quantized to int8 here
+before they are indexed and before they are used as k-NN queries.
+"""
+import logging
+import os
+import threading
+import time
+from utils.index_profiles import get_profile
+
+VECTOR_ENCODING = os.environ.get("VECTOR_ENCODING") or get_profile()["encoding"]
+ENCODING_TTL_SECONDS = 60
+
+_live_encodings = {}
+_live_encodings_lock = threading.Lock()
+
+
+def mapping_encoding(embedding_mapping):
+    """Encoding of a ``knn_vector`` field mapping."""
+    if embedding_mapping.get("data_type") == "byte":
+        return "byte"
+    encoder = embedding_mapping.get("method", {}).get("parameters", {}).get("encoder", {})
+    if encoder.get("parameters", {}).get("type") == "fp16":
+        return "fp16"
+    return "float"
+
+
+def live_encoding(client, index_name):
+    """Encoding of the ``embedding`` field of the index ``index_name`` (or its alias) points to."""
+    now = time.monotonic()
+    with _live_encodings_lock:
+        cached = _live_encodings.get(index_name)
+    if cached and now - cached[1] < ENCODING_TTL_SECONDS:
+        return cached[0]
+    try:
+        mappings = client.indices.get_mapping(index=index_name)
+        fields = next(iter(mappings.values()))["mappings"]["properties"]
+        encoding = mapping_encoding(fields["embedding"])
+    except Exception as e:
+        logging.warning(f"Could not read the vector encoding of {index_name} ({e}); using {VECTOR_ENCODING}")
+        encoding = VECTOR_ENCODING
+    with _live_encodings_lock:
+        _live_encodings[index_name] = (encoding, now)
+    return encoding
+
+
+def quantize_int8(vector):
+    """Scale ``vector`` so its largest component is +/-127 and round to ints.
+
+    Cosine similarity ignores vector length, so a per-vector scale loses only
+    the rounding error and needs no corpus-wide calibration.
+    """
+    peak = max((abs(value) for value in vector), default=0.0)
+    if not peak:
+        return [0] * len(vector)
+    scale = 127.0 / peak
+    return [max(-128, min(127, round(value * scale))) for value in vector]
+
+
+def as_index_vector(vector, encoding=VECTOR_ENCODING):
+    """The form of ``vector`` to write to, or query, an index with ``encoding``."""
+    if vector is None or encoding != "byte":
+        return vector
+    return quantize_int8(vector)